@@ -10,6 +10,10 @@ import (
 	"gorm.io/gorm"
 )
 
+// TicketStream is the Redis Stream the intelligence service consumes new
+// tickets from as a consumer group.
+const TicketStream = "tickets:new"
+
 type WebhookHandler struct {
 	DB    *gorm.DB
 	Redis *redis.CircuitBreakerClient
@@ -62,7 +66,7 @@ func (h *WebhookHandler) HandleFreshdeskWebhook(c *gin.Context) {
 
 	// Publish to Redis (with circuit breaker protection)
 	ctx := c.Request.Context()
-	if err := h.Redis.Publish(ctx, "tickets:new", ticket); err != nil {
+	if err := h.Redis.XAdd(ctx, TicketStream, ticket); err != nil {
 		// Circuit breaker handled the error, log but continue
 		c.JSON(http.StatusAccepted, gin.H{
 			"status":    "saved_but_publish_failed",
@@ -118,7 +122,7 @@ func (h *WebhookHandler) HandleZendeskWebhook(c *gin.Context) {
 
 	// Publish to Redis (with circuit breaker protection)
 	ctx := c.Request.Context()
-	if err := h.Redis.Publish(ctx, "tickets:new", ticket); err != nil {
+	if err := h.Redis.XAdd(ctx, TicketStream, ticket); err != nil {
 		// Circuit breaker handled the error, log but continue
 		c.JSON(http.StatusAccepted, gin.H{
 			"status":    "saved_but_publish_failed",
@@ -98,6 +98,45 @@ func (c *CircuitBreakerClient) Publish(ctx context.Context, channel string, mess
 	return nil
 }
 
+// XAdd appends a message to a stream with circuit breaker protection.
+// Unlike Publish, entries persist until a consumer group acknowledges them,
+// so messages survive consumer restarts.
+func (c *CircuitBreakerClient) XAdd(ctx context.Context, stream string, message interface{}) error {
+	_, err := c.cb.Execute(func() (interface{}, error) {
+		// Marshal message to JSON
+		data, err := json.Marshal(message)
+		if err != nil {
+			return nil, err
+		}
+
+		start := time.Now()
+		err = c.rdb.XAdd(ctx, &goredis.XAddArgs{
+			Stream: stream,
+			Values: map[string]interface{}{"data": data},
+		}).Err()
+		duration := time.Since(start).Seconds()
+
+		// Record metrics
+		status := "success"
+		if err != nil {
+			status = "error"
+		}
+		metrics.RedisOperationsTotal.WithLabelValues("xadd", status).Inc()
+		metrics.RedisOperationDuration.WithLabelValues("xadd").Observe(duration)
+
+		return nil, err
+	})
+
+	if err != nil {
+		// Circuit breaker is open or operation failed
+		log.Printf("⚠️  Redis stream add failed (circuit breaker may be open): %v", err)
+		// Don't return error - allow request to succeed even if Redis is down
+		return nil
+	}
+
+	return nil
+}
+
 // Close closes the Redis connection
 func (c *CircuitBreakerClient) Close() error {
 	return c.rdb.Close()
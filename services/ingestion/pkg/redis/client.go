@@ -42,6 +42,20 @@ func (c *Client) Publish(ctx context.Context, channel string, message interface{
 	return c.rdb.Publish(ctx, channel, data).Err()
 }
 
+// XAdd appends a message to a stream as a JSON "data" field.
+// The stream is not capped: consumers trim entries once every group has
+// acknowledged them, so unread messages are never dropped.
+func (c *Client) XAdd(ctx context.Context, stream string, message interface{}) error {
+	data, err := json.Marshal(message)
+	if err != nil {
+		return err
+	}
+	return c.rdb.XAdd(ctx, &redis.XAddArgs{
+		Stream: stream,
+		Values: map[string]interface{}{"data": data},
+	}).Err()
+}
+
 // Close closes the Redis connection
 func (c *Client) Close() error {
 	return c.rdb.Close()
@@ -7,9 +7,36 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import logging
 
+from app.api.pagination import after_cursor, cached_count, estimated_row_count, next_cursor
+
 logger = logging.getLogger(__name__)
 
 
+def tickets_with_analysis_query(filters=(), limit: int = 50, cursor: Optional[str] = None):
+    """
+    The page statement behind get_tickets_with_analysis.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    from app.models.ticket import Ticket
+    
+    # Only the columns get_tickets_with_analysis reads, as plain rows (no ORM entities)
+    query = select(
+        Ticket.id, Ticket.title, Ticket.description, Ticket.status, Ticket.priority, Ticket.source,
+        Ticket.customer_id, Ticket.customer_email, Ticket.customer_name, Ticket.assigned_to,
+        Ticket.created_at, Ticket.updated_at, Ticket.resolved_at, Ticket.sla_due_at,
+        Ticket.ai_summary, Ticket.ai_sentiment, Ticket.ai_intent, Ticket.ai_suggested_actions
+    )
+    if filters:
+        query = query.where(and_(*filters))
+    if cursor:
+        query = query.where(after_cursor(Ticket.created_at, Ticket.id, cursor))
+    
+    # Keyset pagination and ordering
+    return query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit)
+
+
 async def get_tickets_with_analysis(
     db: AsyncSession,
     status: Optional[str] = None,
@@ -17,17 +44,22 @@ async def get_tickets_with_analysis(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     limit: int = 50,
-    offset: int = 0
-) -> tuple[List[Dict[str, Any]], int]:
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> tuple[List[Dict[str, Any]], Optional[str], Optional[int]]:
     """
-    Fetch tickets with AI analysis, with optional filters.
-    Returns (tickets, total_count)
+    Fetch tickets with AI analysis, newest first, with optional filters.
+    Returns (tickets, next_cursor, total_count)
+    
+    Pass next_cursor back as `cursor` for the following page (None on the
+    last page). total_count is only computed with include_total: the
+    pg_class estimate when unfiltered, else an exact count cached briefly.
+    
+    Raises:
+        ValueError: If the cursor is malformed
     """
     from app.models.ticket import Ticket
     
-    # Build query
-    query = select(Ticket)
-    
     # Apply filters
     filters = []
     if status:
@@ -39,22 +71,21 @@ async def get_tickets_with_analysis(
     if end_date:
         filters.append(Ticket.created_at <= end_date)
     
-    if filters:
-        query = query.where(and_(*filters))
-    
-    # Get total count
-    count_query = select(func.count()).select_from(Ticket)
-    if filters:
-        count_query = count_query.where(and_(*filters))
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    result = await db.execute(tickets_with_analysis_query(filters, limit, cursor))
+    tickets_rows = result.all()
     
-    # Apply pagination and ordering
-    query = query.order_by(Ticket.created_at.desc()).limit(limit).offset(offset)
-    
-    result = await db.execute(query)
-    tickets_rows = result.scalars().all()
+    total = None
+    if include_total:
+        if filters:
+            total = await cached_count(
+                db,
+                select(func.count()).select_from(Ticket).where(and_(*filters)),
+                "tickets:analysis:count",
+                None,
+                {"status": status, "priority": priority, "start_date": start_date, "end_date": end_date}
+            )
+        else:
+            total = await estimated_row_count(db, "tickets")
     
     # Format results
     tickets = []
@@ -89,82 +120,84 @@ async def get_tickets_with_analysis(
         
         tickets.append(ticket_dict)
     
-    return tickets, total
+    return tickets, next_cursor(tickets_rows, limit), total
 
 
-async def get_dashboard_kpis(db: AsyncSession) -> Dict[str, Any]:
+def dashboard_kpi_queries(tenant_id, now: datetime) -> Dict[str, Any]:
     """
-    Calculate dashboard KPIs for the last 7 days.
+    The statements behind get_dashboard_kpis, by KPI.
+    
+    Shared with scripts/check_ticket_indexes.py.
     """
     from app.models.ticket import Ticket
     
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    
-    # Open tickets
-    open_count_query = select(func.count()).select_from(Ticket).where(
-        Ticket.status == 'open'
-    )
-    open_result = await db.execute(open_count_query)
-    open_tickets = open_result.scalar() or 0
-    
-    # SLA risk (urgent/critical tickets with approaching SLA)
-    sla_risk_query = select(func.count()).select_from(Ticket).where(
-        and_(
-            Ticket.priority.in_(['urgent', 'critical']),
-            Ticket.sla_due_at < datetime.utcnow() + timedelta(hours=2),
-            Ticket.status.in_(['open', 'in_progress'])
-        )
-    )
-    sla_risk_result = await db.execute(sla_risk_query)
-    sla_risk = sla_risk_result.scalar() or 0
-    
-    # Average resolution time (in hours)
-    avg_resolution_query = select(
-        func.avg(
-            func.extract('epoch', Ticket.resolved_at - Ticket.created_at) / 3600
-        )
-    ).select_from(Ticket).where(
-        and_(
-            Ticket.resolved_at.isnot(None),
-            Ticket.created_at >= seven_days_ago
-        )
-    )
-    avg_result = await db.execute(avg_resolution_query)
-    avg_resolution = avg_result.scalar() or 0.0
-    
-    # Total tickets in last 7 days
-    total_7d_query = select(func.count()).select_from(Ticket).where(
-        Ticket.created_at >= seven_days_ago
-    )
-    total_7d_result = await db.execute(total_7d_query)
-    total_7d = total_7d_result.scalar() or 0
+    seven_days_ago = now - timedelta(days=7)
     
-    # Resolved tickets in last 7 days
-    resolved_7d_query = select(func.count()).select_from(Ticket).where(
-        and_(
-            Ticket.resolved_at.isnot(None),
+    return {
+        # Open tickets
+        "open_tickets": select(func.count()).select_from(Ticket).where(
+            Ticket.tenant_id == tenant_id,
+            Ticket.status == 'open'
+        ),
+        
+        # SLA risk (urgent/critical tickets with approaching SLA)
+        "sla_risk_count": select(func.count()).select_from(Ticket).where(
+            and_(
+                Ticket.tenant_id == tenant_id,
+                Ticket.priority.in_(['urgent', 'critical']),
+                Ticket.sla_due_at < now + timedelta(hours=2),
+                Ticket.status.in_(['open', 'in_progress'])
+            )
+        ),
+        
+        # Average resolution time (in hours)
+        "avg_resolution_hours": select(
+            func.avg(
+                func.extract('epoch', Ticket.resolved_at - Ticket.created_at) / 3600
+            )
+        ).select_from(Ticket).where(
+            and_(
+                Ticket.tenant_id == tenant_id,
+                Ticket.resolved_at.isnot(None),
+                Ticket.created_at >= seven_days_ago
+            )
+        ),
+        
+        # Total tickets in last 7 days
+        "total_tickets_7d": select(func.count()).select_from(Ticket).where(
+            Ticket.tenant_id == tenant_id,
             Ticket.created_at >= seven_days_ago
-        )
-    )
-    resolved_7d_result = await db.execute(resolved_7d_query)
-    resolved_7d = resolved_7d_result.scalar() or 0
+        ),
+        
+        # Resolved tickets in last 7 days
+        "resolved_tickets_7d": select(func.count()).select_from(Ticket).where(
+            and_(
+                Ticket.tenant_id == tenant_id,
+                Ticket.resolved_at.isnot(None),
+                Ticket.created_at >= seven_days_ago
+            )
+        ),
+    }
+
+
+async def get_dashboard_kpis(db: AsyncSession, tenant_id) -> Dict[str, Any]:
+    """
+    Calculate a tenant's dashboard KPIs for the last 7 days.
+    """
+    kpis = {}
+    for name, query in dashboard_kpi_queries(tenant_id, datetime.utcnow()).items():
+        result = await db.execute(query)
+        kpis[name] = result.scalar() or 0
     
+    kpis["avg_resolution_hours"] = round(kpis["avg_resolution_hours"], 1)
     # Automation rate (placeholder - would need automation tracking)
-    automation_rate = 62.0  # Mock for now
-    
-    return {
-        "open_tickets": open_tickets,
-        "sla_risk_count": sla_risk,
-        "avg_resolution_hours": round(avg_resolution, 1),
-        "automation_rate": automation_rate,
-        "total_tickets_7d": total_7d,
-        "resolved_tickets_7d": resolved_7d
-    }
+    kpis["automation_rate"] = 62.0  # Mock for now
+    return kpis
 
 
-async def get_rca_data(db: AsyncSession, days: int = 30) -> List[Dict[str, Any]]:
+async def get_rca_data(db: AsyncSession, tenant_id, days: int = 30) -> List[Dict[str, Any]]:
     """
-    Get Root Cause Analysis - top issues by volume.
+    Get a tenant's Root Cause Analysis - top issues by volume.
     """
     from app.models.ticket import Ticket
     
@@ -176,6 +209,7 @@ async def get_rca_data(db: AsyncSession, days: int = 30) -> List[Dict[str, Any]]
         func.avg(Ticket.ai_sentiment).label('avg_sentiment')
     ).where(
         and_(
+            Ticket.tenant_id == tenant_id,
             Ticket.created_at >= start_date,
             Ticket.ai_intent.isnot(None)
         )
@@ -198,9 +232,9 @@ async def get_rca_data(db: AsyncSession, days: int = 30) -> List[Dict[str, Any]]
     ]
 
 
-async def get_sentiment_trend(db: AsyncSession, days: int = 7) -> List[Dict[str, Any]]:
+async def get_sentiment_trend(db: AsyncSession, tenant_id, days: int = 7) -> List[Dict[str, Any]]:
     """
-    Get sentiment trend over the last N days.
+    Get a tenant's sentiment trend over the last N days.
     """
     from app.models.ticket import Ticket
     
@@ -211,6 +245,7 @@ async def get_sentiment_trend(db: AsyncSession, days: int = 7) -> List[Dict[str,
         func.avg(Ticket.ai_sentiment).label('score')
     ).where(
         and_(
+            Ticket.tenant_id == tenant_id,
             Ticket.created_at >= start_date,
             Ticket.ai_sentiment.isnot(None)
         )
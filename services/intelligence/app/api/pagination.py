@@ -0,0 +1,148 @@
+"""
+Keyset (cursor) pagination for newest-first listings.
+
+OFFSET pagination makes Postgres walk and discard every earlier row, so
+page N costs O(N * page size). A cursor instead records the (created_at, id)
+of the last row served, and the next page starts right after it in the
+(tenant_id, created_at DESC) index. Every page costs the same as the first.
+
+Ranked results (search) page the same way on (rank, id) instead.
+
+Cursors are opaque to clients: URL-safe base64 of the position.
+
+Totals are optional, because an exact count(*) scans every matching row. For
+an unfiltered table the pg_class estimate is free. Filtered or per-tenant
+counts are cached briefly, keyed on the tenant's tag versions so ticket
+writes invalidate them.
+"""
+import base64
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_key, get_tag_versions
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+COUNT_CACHE_TTL = 60
+
+
+def _pack(values) -> str:
+    payload = json.dumps(values)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _unpack(cursor: str):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    return _pack([created_at.isoformat(), str(row_id)])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, row_id = _unpack(cursor)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_rank_cursor(rank: float, row_id: Any) -> str:
+    return _pack([rank, str(row_id)])
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    """
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        rank, row_id = _unpack(cursor)
+        return float(rank), uuid.UUID(row_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def after_cursor(created_column, id_column, cursor: str):
+    """
+    WHERE clause for rows after the cursor in (created_at DESC, id DESC) order.
+
+    Written as `created_at <= x AND (created_at < x OR id < y)` rather than a
+    row comparison, so the created_at bound is an index condition on
+    (tenant_id, created_at DESC).
+    """
+    created_at, row_id = decode_cursor(cursor)
+    return and_(
+        created_column <= created_at,
+        or_(created_column < created_at, id_column < row_id)
+    )
+
+
+def after_rank_cursor(rank_expression, id_column, cursor: str):
+    """WHERE clause for rows after the cursor in (rank DESC, id DESC) order"""
+    rank, row_id = decode_rank_cursor(cursor)
+    return or_(
+        rank_expression < rank,
+        and_(rank_expression == rank, id_column < row_id)
+    )
+
+
+def next_cursor(rows, limit: int) -> Optional[str]:
+    """Cursor for the page after `rows`, or None if this was the last page"""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at, last.id)
+
+
+async def estimated_row_count(db: AsyncSession, table: str) -> Optional[int]:
+    """Planner's row estimate for a whole table (None if never analyzed)"""
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": table}
+    )
+    estimate = result.scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+async def cached_count(
+    db: AsyncSession,
+    count_query,
+    prefix: str,
+    tenant_id: Optional[str],
+    params: Dict[str, Any],
+    tags: Tuple[str, ...] = ()
+) -> int:
+    """Exact count, cached for COUNT_CACHE_TTL seconds per tenant, filters and tag versions"""
+    key = None
+    try:
+        versions = await get_tag_versions(tenant_id, tags)
+        key = cache_key(prefix, tenant_id, params, versions)
+        client = await redis_client.get_client()
+        cached = await client.get(key)
+        if cached is not None:
+            return int(cached)
+    except Exception as e:
+        logger.warning(f"Count cache read error: {e}")
+
+    total = (await db.execute(count_query)).scalar() or 0
+
+    if key:
+        try:
+            client = await redis_client.get_client()
+            await client.setex(key, COUNT_CACHE_TTL, total)
+        except Exception as e:
+            logger.warning(f"Count cache write error: {e}")
+    return total
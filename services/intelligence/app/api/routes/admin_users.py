@@ -16,6 +16,8 @@ from app.core.auth import (
     require_role,
     get_password_hash
 )
+from app.core import principal_cache
+from app.core.api_keys import generate_api_key
 from app.models.tenant import User, Tenant, Integration, APIKey
 
 router = APIRouter()
@@ -64,6 +66,38 @@ class IntegrationResponse(BaseModel):
     created_at: datetime
 
 
+class APIKeyCreate(BaseModel):
+    name: str
+    permissions: List[str] = []
+    expires_at: Optional[datetime] = None
+
+
+class APIKeyResponse(BaseModel):
+    id: str
+    name: str
+    prefix: Optional[str]
+    permissions: List[str]
+    expires_at: Optional[datetime]
+    last_used_at: Optional[datetime]
+    created_at: datetime
+
+
+class APIKeyCreated(APIKeyResponse):
+    key: str  # Only returned once, at creation
+
+
+def api_key_response(api_key: APIKey) -> dict:
+    return {
+        "id": str(api_key.id),
+        "name": api_key.name,
+        "prefix": api_key.prefix,
+        "permissions": api_key.permissions or [],
+        "expires_at": api_key.expires_at,
+        "last_used_at": api_key.last_used_at,
+        "created_at": api_key.created_at
+    }
+
+
 # User Management
 @router.get("/users", response_model=List[UserResponse])
 async def list_users(
@@ -116,7 +150,7 @@ async def create_user(
         id=uuid.uuid4(),
         tenant_id=tenant.id,
         email=request.email,
-        password_hash=get_password_hash(request.password),
+        password_hash=await get_password_hash(request.password),
         full_name=request.full_name,
         role=request.role,
         is_active=True
@@ -168,6 +202,7 @@ async def update_user(
     
     user.updated_at = datetime.utcnow()
     await db.commit()
+    await principal_cache.invalidate_user(user.id)
     await db.refresh(user)
     
     return UserResponse(
@@ -209,6 +244,7 @@ async def delete_user(
         )
     
     await db.commit()
+    await principal_cache.invalidate_user(user_id)
 
 
 # Tenant Management
@@ -243,6 +279,7 @@ async def update_tenant(
     
     tenant.updated_at = datetime.utcnow()
     await db.commit()
+    await principal_cache.invalidate_tenant(tenant.id)
     await db.refresh(tenant)
     
     return {
@@ -332,3 +369,74 @@ async def delete_integration(
         )
     
     await db.commit()
+
+
+# API Key Management
+@router.get("/api-keys", response_model=List[APIKeyResponse])
+async def list_api_keys(
+    tenant: Tenant = Depends(get_current_tenant),
+    current_user: User = Depends(require_role('admin')),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the tenant's API keys (without secrets)"""
+    result = await db.execute(
+        select(APIKey)
+        .where(APIKey.tenant_id == tenant.id)
+        .order_by(APIKey.created_at.desc())
+    )
+    
+    return [APIKeyResponse(**api_key_response(api_key)) for api_key in result.scalars().all()]
+
+
+@router.post("/api-keys", response_model=APIKeyCreated, status_code=status.HTTP_201_CREATED)
+async def create_api_key(
+    request: APIKeyCreate,
+    tenant: Tenant = Depends(get_current_tenant),
+    current_user: User = Depends(require_role('admin')),
+    db: AsyncSession = Depends(get_db)
+):
+    """Issue an API key. The full key is only shown in this response."""
+    raw_key, prefix, key_hash = generate_api_key()
+    api_key = APIKey(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        name=request.name,
+        prefix=prefix,
+        key_hash=key_hash,
+        permissions=request.permissions,
+        expires_at=request.expires_at
+    )
+    db.add(api_key)
+    await db.commit()
+    await db.refresh(api_key)
+    
+    return APIKeyCreated(key=raw_key, **api_key_response(api_key))
+
+
+@router.delete("/api-keys/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_api_key(
+    key_id: str,
+    tenant: Tenant = Depends(get_current_tenant),
+    current_user: User = Depends(require_role('admin')),
+    db: AsyncSession = Depends(get_db)
+):
+    """Revoke an API key"""
+    result = await db.execute(
+        delete(APIKey)
+        .where(
+            APIKey.id == key_id,
+            APIKey.tenant_id == tenant.id
+        )
+        .returning(APIKey.prefix)
+    )
+    revoked = result.first()
+    
+    if revoked is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found"
+        )
+    
+    await db.commit()
+    if revoked.prefix:
+        await principal_cache.invalidate_api_key(revoked.prefix)
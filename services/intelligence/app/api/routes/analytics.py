@@ -12,18 +12,23 @@ from app.api.models.responses import (
     SentimentTrendPoint,
     VolumeDataPoint
 )
-from app.api.db import get_dashboard_kpis, get_rca_data, get_sentiment_trend
-from app.core.database import get_db
+from app.api.db import get_dashboard_kpis
+from app.core.auth import get_current_tenant
+from app.core.database import get_read_db
 from app.core.cache import redis_cache
+from app.models.tenant import Tenant
 
 router = APIRouter()
 
 
 @router.get("/summary", response_model=DashboardKPIs)
-@redis_cache(prefix="analytics:summary", ttl=60)  # 1-minute cache
-async def get_summary(db: AsyncSession = Depends(get_db)):
+@redis_cache(prefix="analytics:summary", ttl=900, stale_ttl=3600, local_ttl=5, tags=("tickets",))  # Tenant-scoped; invalidated on the tenant's ticket writes
+async def get_summary(
+    tenant: Tenant = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    Get dashboard summary KPIs for the last 7 days.
+    Get the tenant's dashboard summary KPIs for the last 7 days.
     
     Returns:
     - Open tickets count
@@ -33,15 +38,17 @@ async def get_summary(db: AsyncSession = Depends(get_db)):
     - Total tickets (7 days)
     - Resolved tickets (7 days)
     """
-    kpis = await get_dashboard_kpis(db)
+    kpis = await get_dashboard_kpis(db, tenant.id)
     return DashboardKPIs(**kpis)
 
 
-@router.get("/rca", response_model=List[RCAItem])
-@redis_cache(prefix="analytics:rca", ttl=300)  # 5-minute cache
+# rca_metrics and sentiment_metrics are precomputed for all tenants, so
+# these entries are shared rather than keyed per tenant
+@router.get("/rca", response_model=List[RCAItem], dependencies=[Depends(get_current_tenant)])
+@redis_cache(prefix="analytics:rca", ttl=300, stale_ttl=3600, vary=("days",), local_ttl=30, per_tenant=False)  # 5-minute cache, then refreshed in the background
 async def get_root_cause_analysis(
     days: int = Query(30, ge=1, le=90),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get Root Cause Analysis - top issues by volume.
@@ -66,11 +73,11 @@ async def get_root_cause_analysis(
     ]
 
 
-@router.get("/sentiment", response_model=List[SentimentTrendPoint])
-@redis_cache(prefix="analytics:sentiment", ttl=300)  # 5-minute cache
+@router.get("/sentiment", response_model=List[SentimentTrendPoint], dependencies=[Depends(get_current_tenant)])
+@redis_cache(prefix="analytics:sentiment", ttl=300, stale_ttl=3600, vary=("days",), local_ttl=30, per_tenant=False)  # 5-minute cache, then refreshed in the background
 async def get_sentiment_analysis(
     days: int = Query(7, ge=1, le=30),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get sentiment trend over time.
@@ -101,10 +108,10 @@ async def get_sentiment_analysis(
     ]
 
 
-@router.get("/volume-forecast", response_model=List[VolumeDataPoint])
+@router.get("/volume-forecast", response_model=List[VolumeDataPoint], dependencies=[Depends(get_current_tenant)])
 async def get_volume_forecast(
     days: int = Query(30, ge=7, le=90),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get 30-day volume forecast with confidence intervals.
@@ -4,6 +4,7 @@ Authentication and user management API routes
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import undefer
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
@@ -97,7 +98,7 @@ async def signup(request: SignupRequest, db: AsyncSession = Depends(get_db)):
         id=uuid.uuid4(),
         tenant_id=tenant.id,
         email=request.email,
-        password_hash=get_password_hash(request.password),
+        password_hash=await get_password_hash(request.password),
         full_name=request.full_name,
         role='admin',
         is_active=True
@@ -137,11 +138,11 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     """
     # Find user by email (across all tenants)
     result = await db.execute(
-        select(User).where(User.email == request.email)
+        select(User).options(undefer(User.password_hash)).where(User.email == request.email)
     )
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user or not await verify_password(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
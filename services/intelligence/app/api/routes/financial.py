@@ -9,7 +9,7 @@ from datetime import datetime, timedelta, date
 from pydantic import BaseModel
 from decimal import Decimal
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.executive import FinancialMetric, ROICalculation
 
 router = APIRouter()
@@ -48,7 +48,7 @@ class FinancialTrendPoint(BaseModel):
 @router.get("/impact", response_model=FinancialImpactSummary)
 async def get_financial_impact(
     days: int = Query(30, ge=1, le=365),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get financial impact summary for the specified period.
@@ -112,7 +112,7 @@ async def get_financial_impact(
 @router.get("/roi", response_model=ROIResponse)
 async def get_roi(
     days: int = Query(30, ge=1, le=365),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Calculate ROI for the specified period.
@@ -183,7 +183,7 @@ async def get_roi(
 @router.get("/trends", response_model=List[FinancialTrendPoint])
 async def get_financial_trends(
     days: int = Query(30, ge=7, le=365),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get financial trends over time.
@@ -220,7 +220,7 @@ async def get_financial_trends(
 @router.get("/breakdown")
 async def get_financial_breakdown(
     days: int = Query(30, ge=1, le=365),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed breakdown of financial impact by category.
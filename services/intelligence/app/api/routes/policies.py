@@ -3,7 +3,7 @@ from typing import List
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.policies import Policy as PolicyModel
 
 router = APIRouter()
@@ -24,7 +24,7 @@ class PolicyStats(BaseModel):
     total_violations: int
 
 @router.get("/", response_model=List[Policy])
-async def get_policies(db: AsyncSession = Depends(get_db)):
+async def get_policies(db: AsyncSession = Depends(get_read_db)):
     """Get all governance policies"""
     result = await db.execute(select(PolicyModel))
     policies = result.scalars().all()
@@ -43,7 +43,7 @@ async def get_policies(db: AsyncSession = Depends(get_db)):
     ]
 
 @router.get("/stats", response_model=PolicyStats)
-async def get_policy_stats(db: AsyncSession = Depends(get_db)):
+async def get_policy_stats(db: AsyncSession = Depends(get_read_db)):
     """Get policy compliance statistics"""
     # Get total count
     total_result = await db.execute(select(func.count(PolicyModel.id)))
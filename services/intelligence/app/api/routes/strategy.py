@@ -15,7 +15,7 @@ from app.api.models.responses import (
     FrictionCostItem,
     StrategicRecommendation
 )
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.ticket import Ticket
 
 router = APIRouter()
@@ -24,7 +24,7 @@ router = APIRouter()
 @router.get("/topics", response_model=List[TopicCluster])
 async def get_topic_clusters(
     days: int = Query(30, ge=7, le=90),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get semantic topic clusters (volume vs sentiment).
@@ -76,7 +76,7 @@ async def get_topic_clusters(
 @router.get("/regional", response_model=List[RegionalData])
 async def get_regional_intelligence(
     days: int = Query(30, ge=7, le=90),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get regional intelligence (sentiment and friction cost by geography).
@@ -102,7 +102,7 @@ async def get_regional_intelligence(
 @router.get("/churn", response_model=List[ChurnPrediction])
 async def get_churn_predictions(
     days: int = Query(90, ge=30, le=180),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get churn prediction for high-value customers.
@@ -135,7 +135,7 @@ async def get_churn_predictions(
 @router.get("/friction-cost", response_model=List[FrictionCostItem])
 async def get_friction_cost_analysis(
     days: int = Query(30, ge=7, le=90),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get cost of friction analysis.
@@ -179,7 +179,7 @@ async def get_friction_cost_analysis(
 
 @router.get("/recommendations", response_model=List[StrategicRecommendation])
 async def get_strategic_recommendations(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get AI-generated strategic recommendations.
@@ -1,18 +1,22 @@
 """
 Ticket management API routes
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, update, delete
 from typing import List, Optional
 from pydantic import BaseModel
+from pydantic_core import to_json
 from datetime import datetime
 import uuid
 
 from app.core.database import get_db
+from app.api.pagination import after_cursor, cached_count, next_cursor
 from app.core.auth import get_current_user, get_current_tenant
+from app.core.cache import invalidate_tags
 from app.models.ticket import Ticket, TicketComment
 from app.models.tenant import User, Tenant
+from app.services import ticket_search
 
 router = APIRouter()
 
@@ -38,6 +42,12 @@ class TicketResponse(BaseModel):
     updated_at: str
 
 
+class TicketSearchResult(TicketResponse):
+    rank: float
+    title_highlight: str
+    snippet: Optional[str]
+
+
 class TicketDetailResponse(TicketResponse):
     ai_entities: Optional[dict]
     tags: List[str]
@@ -68,6 +78,85 @@ class CommentResponse(BaseModel):
     created_at: str
 
 
+# TicketResponse's fields as columns. List routes select these as plain rows
+# (no ORM entities, no identity map, none of the JSONB detail columns) and
+# encode them straight to JSON bytes; pydantic-core renders UUIDs and
+# datetimes the way str() and isoformat() did. TicketResponse still
+# documents the shape.
+TICKET_LIST_COLUMNS = (
+    Ticket.id,
+    Ticket.title,
+    Ticket.description,
+    Ticket.status,
+    Ticket.priority,
+    Ticket.customer_name,
+    Ticket.customer_email,
+    Ticket.assigned_to,
+    Ticket.assigned_team,
+    Ticket.ai_summary,
+    Ticket.ai_intent,
+    Ticket.ai_category,
+    Ticket.ai_sentiment,
+    Ticket.ai_priority,
+    Ticket.ai_suggested_actions,
+    Ticket.created_at,
+    func.coalesce(Ticket.updated_at, Ticket.created_at).label("updated_at"),
+)
+
+
+def rows_json(rows) -> bytes:
+    """JSON array of result rows, keyed by column label"""
+    return to_json([row._asdict() for row in rows])
+
+
+# Statement builders, shared with scripts/check_ticket_indexes.py so the
+# EXPLAIN check runs exactly what the routes run
+def ticket_filters(
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    search: Optional[str] = None
+) -> List:
+    """WHERE clauses for the optional list/search filters"""
+    filters = []
+    if status:
+        filters.append(Ticket.status == status)
+    if priority:
+        filters.append(Ticket.priority == priority)
+    if category:
+        filters.append(Ticket.ai_category == category)
+    if assigned_to:
+        filters.append(Ticket.assigned_to == assigned_to)
+    if search:
+        filters.append(ticket_search.search_condition(search))
+    return filters
+
+
+def ticket_list_query(tenant_id, filters=(), limit: int = 50, offset: int = 0, cursor: Optional[str] = None):
+    """
+    One page of a tenant's tickets as TICKET_LIST_COLUMNS rows, newest first.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = select(*TICKET_LIST_COLUMNS).where(Ticket.tenant_id == tenant_id, *filters)
+    if cursor:
+        query = query.where(after_cursor(Ticket.created_at, Ticket.id, cursor))
+    elif offset:
+        query = query.offset(offset)
+    return query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit)
+
+
+def ticket_count_query(tenant_id, filters=()):
+    return select(func.count()).select_from(Ticket).where(Ticket.tenant_id == tenant_id, *filters)
+
+
+def ticket_stats_query(tenant_id, column):
+    """A tenant's ticket count per value of `column`"""
+    return select(column, func.count(Ticket.id).label('count')).where(Ticket.tenant_id == tenant_id).group_by(column)
+
+
 @router.get("/", response_model=List[TicketResponse])
 async def list_tickets(
     status: Optional[str] = None,
@@ -77,54 +166,78 @@ async def list_tickets(
     search: Optional[str] = None,
     limit: int = Query(50, le=100),
     offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     tenant: Tenant = Depends(get_current_tenant),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List tickets with filters"""
-    query = select(Ticket).where(Ticket.tenant_id == tenant.id)
-    
-    if status:
-        query = query.where(Ticket.status == status)
-    if priority:
-        query = query.where(Ticket.priority == priority)
-    if category:
-        query = query.where(Ticket.ai_category == category)
-    if assigned_to:
-        query = query.where(Ticket.assigned_to == assigned_to)
-    if search:
-        query = query.where(
-            (Ticket.title.ilike(f"%{search}%")) |
-            (Ticket.description.ilike(f"%{search}%"))
-        )
+    """
+    List tickets with filters, newest first.
     
-    query = query.order_by(Ticket.created_at.desc()).limit(limit).offset(offset)
+    Paginate by passing the X-Next-Cursor response header back as `cursor`
+    (the header is absent on the last page). `offset` still works but gets
+    slower the deeper it goes. With `include_total`, X-Total-Count carries
+    the number of matching tickets (cached for up to a minute).
+    """
+    filters = ticket_filters(status, priority, category, assigned_to, search)
+    try:
+        query = ticket_list_query(tenant.id, filters, limit, offset, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
     result = await db.execute(query)
-    tickets = result.scalars().all()
+    rows = result.all()
     
-    return [
-        TicketResponse(
-            id=str(ticket.id),
-            title=ticket.title,
-            description=ticket.description,
-            status=ticket.status,
-            priority=ticket.priority,
-            customer_name=ticket.customer_name,
-            customer_email=ticket.customer_email,
-            assigned_to=str(ticket.assigned_to) if ticket.assigned_to else None,
-            assigned_team=ticket.assigned_team,
-            ai_summary=ticket.ai_summary,
-            ai_intent=ticket.ai_intent,
-            ai_category=ticket.ai_category,
-            ai_sentiment=ticket.ai_sentiment,
-            ai_priority=ticket.ai_priority,
-            ai_suggested_actions=ticket.ai_suggested_actions,
-            created_at=ticket.created_at.isoformat(),
-            updated_at=ticket.updated_at.isoformat() if ticket.updated_at else ticket.created_at.isoformat()
+    headers = {}
+    page_cursor = next_cursor(rows, limit)
+    if page_cursor:
+        headers["X-Next-Cursor"] = page_cursor
+    if include_total:
+        total = await cached_count(
+            db,
+            ticket_count_query(tenant.id, filters),
+            "tickets:count",
+            str(tenant.id),
+            {"status": status, "priority": priority, "category": category,
+             "assigned_to": assigned_to, "search": search},
+            tags=("tickets",)
         )
-        for ticket in tickets
-    ]
+        headers["X-Total-Count"] = str(total)
+    
+    return Response(rows_json(rows), media_type="application/json", headers=headers)
+
+
+@router.get("/search", response_model=List[TicketSearchResult])
+async def search_tickets(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = Query(20, le=100),
+    cursor: Optional[str] = None,
+    tenant: Tenant = Depends(get_current_tenant),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text ticket search, best match first.
+    
+    `q` takes web-search syntax (words, "quoted phrases", -excluded, or).
+    Queries of three or more characters also match substrings of the title
+    and description. `title_highlight` and `snippet` wrap matched words in
+    <mark> tags. Paginate with the X-Next-Cursor header as in list_tickets.
+    """
+    filters = ticket_filters(status, priority, category)
+    try:
+        rows, page_cursor = await ticket_search.search_tickets(
+            db, tenant.id, q, TICKET_LIST_COLUMNS, limit, cursor, tuple(filters)
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    headers = {"X-Next-Cursor": page_cursor} if page_cursor else {}
+    return Response(rows_json(rows), media_type="application/json", headers=headers)
 
 
 @router.get("/{ticket_id}", response_model=TicketDetailResponse)
@@ -212,6 +325,7 @@ async def update_ticket(
     ticket.updated_at = datetime.utcnow()
     
     await db.commit()
+    await invalidate_tags(tenant.id, "tickets")
     await db.refresh(ticket)
     
     return await get_ticket(ticket_id, tenant, user, db)
@@ -301,36 +415,15 @@ async def get_ticket_stats(
 ):
     """Get ticket statistics"""
     # Count by status
-    status_result = await db.execute(
-        select(
-            Ticket.status,
-            func.count(Ticket.id).label('count')
-        ).where(
-            Ticket.tenant_id == tenant.id
-        ).group_by(Ticket.status)
-    )
+    status_result = await db.execute(ticket_stats_query(tenant.id, Ticket.status))
     status_counts = {row.status: row.count for row in status_result}
     
     # Count by priority
-    priority_result = await db.execute(
-        select(
-            Ticket.priority,
-            func.count(Ticket.id).label('count')
-        ).where(
-            Ticket.tenant_id == tenant.id
-        ).group_by(Ticket.priority)
-    )
+    priority_result = await db.execute(ticket_stats_query(tenant.id, Ticket.priority))
     priority_counts = {row.priority: row.count for row in priority_result if row.priority}
     
     # Count by category
-    category_result = await db.execute(
-        select(
-            Ticket.ai_category,
-            func.count(Ticket.id).label('count')
-        ).where(
-            Ticket.tenant_id == tenant.id
-        ).group_by(Ticket.ai_category)
-    )
+    category_result = await db.execute(ticket_stats_query(tenant.id, Ticket.ai_category))
     category_counts = {row.ai_category: row.count for row in category_result if row.ai_category}
     
     return {
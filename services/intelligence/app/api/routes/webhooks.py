@@ -1,18 +1,25 @@
 """
 Webhook receivers for external ticketing systems
 """
-from fastapi import APIRouter, Request, Depends, HTTPException, Header
+from fastapi import APIRouter, Request, Depends, HTTPException, Header, BackgroundTasks, Query, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 import uuid
-from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
+import json
 import logging
 
 from app.core.database import get_db
+from app.core.auth import api_key_header, get_api_key_tenant
+from app.core import principal_cache
 from app.models.ticket import Ticket
 from app.models.tenant import Tenant
-from app.services.ticket_understanding import TicketUnderstandingService
+from app.services.ticket_understanding import ticket_understanding_service
+from app.services.ticket_service import ticket_service, analysis_columns
+from app.services.analysis_queue import enqueue_analysis, enqueue_analysis_bulk
+from app.services.ticket_ingest import UpsertResult, bulk_upsert_tickets, staging_record, upsert_ticket
+from app.core.cache import invalidate_tags
 from app.core.config import get_settings
 
 router = APIRouter()
@@ -22,16 +29,17 @@ logger = logging.getLogger(__name__)
 
 async def get_tenant_from_webhook(
     x_tenant_id: Optional[str] = Header(None),
+    raw_key: Optional[str] = Depends(api_key_header),
     db: AsyncSession = Depends(get_db)
 ) -> Tenant:
-    """Extract tenant from webhook headers"""
+    """Extract tenant from webhook headers (X-API-Key, else X-Tenant-ID)"""
+    if raw_key:
+        return await get_api_key_tenant(raw_key, db)
+    
     if not x_tenant_id:
         raise HTTPException(status_code=400, detail="Missing X-Tenant-ID header")
     
-    result = await db.execute(
-        select(Tenant).where(Tenant.id == x_tenant_id)
-    )
-    tenant = result.scalar_one_or_none()
+    tenant = await principal_cache.get_tenant(db, x_tenant_id)
     
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
@@ -61,9 +69,161 @@ def map_freshdesk_priority(priority: int) -> str:
     return priority_map.get(priority, 'medium')
 
 
+def freshdesk_ticket_fields(payload: dict) -> dict:
+    """
+    Normalize a Freshdesk ticket payload to ticket columns
+    
+    Title and description are None when the event omits them, so updates
+    keep the stored values.
+    """
+    # Freshdesk sends ticket data in different formats depending on event
+    ticket_data = payload.get("freshdesk_webhook", payload)
+    requester = ticket_data.get("requester") or {}
+    
+    return {
+        "external_id": str(ticket_data.get("id")),
+        "source": "freshdesk",
+        "title": ticket_data.get("subject"),
+        "description": ticket_data.get("description_text"),
+        "status": map_freshdesk_status(ticket_data.get("status", 2)),
+        "priority": map_freshdesk_priority(ticket_data.get("priority", 2)),
+        "customer_email": requester.get("email"),
+        "customer_name": requester.get("name"),
+    }
+
+
+def zendesk_ticket_fields(payload: dict) -> dict:
+    """Normalize a Zendesk ticket payload to ticket columns"""
+    ticket_data = payload.get("ticket", payload)
+    requester = ticket_data.get("requester") or {}
+    
+    return {
+        "external_id": str(ticket_data.get("id")),
+        "source": "zendesk",
+        "title": ticket_data.get("subject"),
+        "description": ticket_data.get("description"),
+        "status": ticket_data.get("status", "open"),
+        "priority": ticket_data.get("priority", "normal"),
+        "customer_email": requester.get("email"),
+        "customer_name": requester.get("name"),
+    }
+
+
+def manual_ticket_fields(data: dict) -> dict:
+    """Normalize a manual ticket body to ticket columns"""
+    return {
+        "external_id": None,
+        "source": "manual",
+        "title": data.get("title", "No title"),
+        "description": data.get("description", ""),
+        "status": "open",
+        "priority": "medium",
+        "customer_email": data.get("customer_email"),
+        "customer_name": data.get("customer_name"),
+    }
+
+
+TICKET_NORMALIZERS = {
+    "freshdesk": freshdesk_ticket_fields,
+    "zendesk": zendesk_ticket_fields,
+    "manual": manual_ticket_fields,
+}
+
+
+def is_async_ingestion() -> bool:
+    """Whether webhooks hand analysis to the worker tier instead of running it inline"""
+    return settings.WEBHOOK_ANALYSIS_MODE == "async"
+
+
+async def accept_ticket(
+    request: Request,
+    db: AsyncSession,
+    ticket_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    background_tasks: BackgroundTasks
+) -> JSONResponse:
+    """
+    Commit an upserted ticket and enqueue its AI analysis.
+    
+    Responds 202 with a status URL the caller can poll for analysis progress.
+    If the queue is unavailable the analysis still runs, in-process after the
+    response is sent.
+    """
+    await db.commit()
+    await invalidate_tags(tenant_id, "tickets")
+    
+    ticket_id = str(ticket_id)
+    try:
+        await enqueue_analysis(ticket_id, tenant_id)
+    except Exception as e:
+        logger.warning(f"Failed to enqueue analysis for ticket {ticket_id}, running in-process: {e}")
+        background_tasks.add_task(ticket_service.analyze_and_store, ticket_id)
+    
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "status": "accepted",
+            "ticket_id": ticket_id,
+            "analysis_status": "pending",
+            "status_url": str(request.url_for("get_analysis_status", ticket_id=ticket_id))
+        }
+    )
+
+
+async def analyze_inline(db: AsyncSession, ticket_id: uuid.UUID, tenant_id: uuid.UUID, fields: dict):
+    """Run AI analysis before responding (sync ingestion mode)"""
+    # Don't hold the new row's transaction open for the LLM round trip
+    await db.commit()
+    await invalidate_tags(tenant_id, "tickets")
+    
+    analysis = await ticket_understanding_service.analyze_ticket(
+        fields.get("title") or "No subject",
+        fields.get("description")
+    )
+    
+    await db.execute(
+        update(Ticket).where(Ticket.id == ticket_id).values(**analysis_columns(analysis))
+    )
+    await db.commit()
+    await invalidate_tags(tenant_id, "tickets")
+    
+    return analysis
+
+
+async def apply_update(
+    request: Request,
+    db: AsyncSession,
+    result: UpsertResult,
+    tenant_id: uuid.UUID,
+    background_tasks: BackgroundTasks
+):
+    """
+    Finish an update to an existing ticket.
+    
+    Analysis is re-run only when the title or description changed; status
+    and priority churn costs no LLM call.
+    """
+    ticket_id = str(result.ticket_id)
+    if not result.content_changed:
+        await db.commit()
+        if result.updated:
+            await invalidate_tags(tenant_id, "tickets")
+        return {"status": "updated" if result.updated else "unchanged", "ticket_id": ticket_id}
+    
+    if is_async_ingestion():
+        return await accept_ticket(request, db, result.ticket_id, tenant_id, background_tasks)
+    
+    # The event may carry only part of the content, so analyze the stored row
+    await db.commit()
+    await invalidate_tags(tenant_id, "tickets")
+    await ticket_service.analyze_and_store(ticket_id, fallback=True)
+    return {"status": "updated", "ticket_id": ticket_id, "reanalyzed": True}
+
+
 @router.post("/freshdesk")
 async def freshdesk_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     tenant: Tenant = Depends(get_tenant_from_webhook),
     db: AsyncSession = Depends(get_db)
 ):
@@ -77,70 +237,25 @@ async def freshdesk_webhook(
         payload = await request.json()
         logger.info(f"Received Freshdesk webhook for tenant {tenant.id}")
         
-        # Freshdesk sends ticket data in different formats depending on event
-        ticket_data = payload.get("freshdesk_webhook", payload)
-        
-        # Check if ticket already exists
-        external_id = str(ticket_data.get("id"))
-        result = await db.execute(
-            select(Ticket).where(
-                Ticket.tenant_id == tenant.id,
-                Ticket.source == "freshdesk",
-                Ticket.external_id == external_id
-            )
-        )
-        existing_ticket = result.scalar_one_or_none()
+        fields = freshdesk_ticket_fields(payload)
+        result = await upsert_ticket(db, tenant.id, fields)
+        ticket_id = result.ticket_id
         
-        if existing_ticket:
-            # Update existing ticket
-            existing_ticket.title = ticket_data.get("subject", existing_ticket.title)
-            existing_ticket.description = ticket_data.get("description_text", existing_ticket.description)
-            existing_ticket.status = map_freshdesk_status(ticket_data.get("status", 2))
-            existing_ticket.priority = map_freshdesk_priority(ticket_data.get("priority", 2))
-            existing_ticket.updated_at = datetime.utcnow()
-            
-            await db.commit()
-            return {"status": "updated", "ticket_id": str(existing_ticket.id)}
+        if not result.created:
+            return await apply_update(request, db, result, tenant.id, background_tasks)
         
-        # Create new ticket
-        ticket = Ticket(
-            id=uuid.uuid4(),
-            tenant_id=tenant.id,
-            external_id=external_id,
-            source="freshdesk",
-            title=ticket_data.get("subject", "No subject"),
-            description=ticket_data.get("description_text", ""),
-            status=map_freshdesk_status(ticket_data.get("status", 2)),
-            priority=map_freshdesk_priority(ticket_data.get("priority", 2)),
-            customer_email=ticket_data.get("requester", {}).get("email"),
-            customer_name=ticket_data.get("requester", {}).get("name"),
-        )
+        if is_async_ingestion():
+            logger.info(f"Accepted ticket {ticket_id} from Freshdesk")
+            return await accept_ticket(request, db, ticket_id, tenant.id, background_tasks)
         
         # Run AI analysis
-        ai_service = TicketUnderstandingService(settings.GROQ_API_KEY)
-        analysis = await ai_service.analyze_ticket(
-            ticket.title,
-            ticket.description
-        )
+        analysis = await analyze_inline(db, ticket_id, tenant.id, fields)
         
-        # Update ticket with AI insights
-        ticket.ai_summary = analysis.summary
-        ticket.ai_intent = analysis.intent
-        ticket.ai_entities = analysis.entities
-        ticket.ai_sentiment = analysis.sentiment
-        ticket.ai_priority = analysis.priority
-        ticket.ai_category = analysis.category
-        ticket.ai_suggested_actions = analysis.suggested_actions
-        
-        db.add(ticket)
-        await db.commit()
-        await db.refresh(ticket)
-        
-        logger.info(f"Created ticket {ticket.id} from Freshdesk")
+        logger.info(f"Created ticket {ticket_id} from Freshdesk")
         
         return {
             "status": "created",
-            "ticket_id": str(ticket.id),
+            "ticket_id": str(ticket_id),
             "ai_analysis": {
                 "intent": analysis.intent,
                 "category": analysis.category,
@@ -156,6 +271,7 @@ async def freshdesk_webhook(
 @router.post("/zendesk")
 async def zendesk_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     tenant: Tenant = Depends(get_tenant_from_webhook),
     db: AsyncSession = Depends(get_db)
 ):
@@ -169,41 +285,20 @@ async def zendesk_webhook(
         payload = await request.json()
         logger.info(f"Received Zendesk webhook for tenant {tenant.id}")
         
-        ticket_data = payload.get("ticket", payload)
-        
-        # Create ticket
-        ticket = Ticket(
-            id=uuid.uuid4(),
-            tenant_id=tenant.id,
-            external_id=str(ticket_data.get("id")),
-            source="zendesk",
-            title=ticket_data.get("subject", "No subject"),
-            description=ticket_data.get("description", ""),
-            status=ticket_data.get("status", "open"),
-            priority=ticket_data.get("priority", "normal"),
-            customer_email=ticket_data.get("requester", {}).get("email"),
-            customer_name=ticket_data.get("requester", {}).get("name"),
-        )
+        fields = zendesk_ticket_fields(payload)
+        result = await upsert_ticket(db, tenant.id, fields)
+        ticket_id = result.ticket_id
         
-        # Run AI analysis
-        ai_service = TicketUnderstandingService(settings.GROQ_API_KEY)
-        analysis = await ai_service.analyze_ticket(
-            ticket.title,
-            ticket.description
-        )
+        if not result.created:
+            return await apply_update(request, db, result, tenant.id, background_tasks)
         
-        ticket.ai_summary = analysis.summary
-        ticket.ai_intent = analysis.intent
-        ticket.ai_entities = analysis.entities
-        ticket.ai_sentiment = analysis.sentiment
-        ticket.ai_priority = analysis.priority
-        ticket.ai_category = analysis.category
-        ticket.ai_suggested_actions = analysis.suggested_actions
+        if is_async_ingestion():
+            return await accept_ticket(request, db, ticket_id, tenant.id, background_tasks)
         
-        db.add(ticket)
-        await db.commit()
+        # Run AI analysis
+        await analyze_inline(db, ticket_id, tenant.id, fields)
         
-        return {"status": "created", "ticket_id": str(ticket.id)}
+        return {"status": "created", "ticket_id": str(ticket_id)}
         
     except Exception as e:
         logger.error(f"Zendesk webhook error: {e}")
@@ -213,6 +308,7 @@ async def zendesk_webhook(
 @router.post("/manual")
 async def create_manual_ticket(
     request: Request,
+    background_tasks: BackgroundTasks,
     tenant: Tenant = Depends(get_tenant_from_webhook),
     db: AsyncSession = Depends(get_db)
 ):
@@ -233,40 +329,18 @@ async def create_manual_ticket(
     try:
         data = await request.json()
         
-        ticket = Ticket(
-            id=uuid.uuid4(),
-            tenant_id=tenant.id,
-            source="manual",
-            title=data.get("title", "No title"),
-            description=data.get("description", ""),
-            customer_email=data.get("customer_email"),
-            customer_name=data.get("customer_name"),
-            status="open",
-            priority="medium"
-        )
+        fields = manual_ticket_fields(data)
+        ticket_id = (await upsert_ticket(db, tenant.id, fields)).ticket_id
         
-        # Run AI analysis
-        ai_service = TicketUnderstandingService(settings.GROQ_API_KEY)
-        analysis = await ai_service.analyze_ticket(
-            ticket.title,
-            ticket.description
-        )
+        if is_async_ingestion():
+            return await accept_ticket(request, db, ticket_id, tenant.id, background_tasks)
         
-        ticket.ai_summary = analysis.summary
-        ticket.ai_intent = analysis.intent
-        ticket.ai_entities = analysis.entities
-        ticket.ai_sentiment = analysis.sentiment
-        ticket.ai_priority = analysis.priority
-        ticket.ai_category = analysis.category
-        ticket.ai_suggested_actions = analysis.suggested_actions
-        
-        db.add(ticket)
-        await db.commit()
-        await db.refresh(ticket)
+        # Run AI analysis
+        analysis = await analyze_inline(db, ticket_id, tenant.id, fields)
         
         return {
             "status": "created",
-            "ticket_id": str(ticket.id),
+            "ticket_id": str(ticket_id),
             "ai_analysis": {
                 "summary": analysis.summary,
                 "intent": analysis.intent,
@@ -279,3 +353,153 @@ async def create_manual_ticket(
     except Exception as e:
         logger.error(f"Manual ticket creation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+
+async def iter_ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    """Yield NDJSON lines as the request body streams in"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+@router.post("/bulk", status_code=status.HTTP_202_ACCEPTED)
+async def bulk_ingest(
+    request: Request,
+    source: str = Query("manual", pattern="^(freshdesk|zendesk|manual)$"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    tenant: Tenant = Depends(get_tenant_from_webhook),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk-ingest tickets from a streamed NDJSON body
+    
+    Each line is one ticket in the Freshdesk, Zendesk or manual shape
+    (selected with `source`). Lines are parsed as they arrive and upserted
+    in batches of `batch_size`; new tickets and tickets whose content changed
+    are queued for AI analysis.
+    
+    Headers required:
+    - X-Tenant-ID: Your tenant UUID
+    """
+    normalize = TICKET_NORMALIZERS[source]
+    batches = []
+    errors = []
+    records = []
+    rejected = 0
+    line_number = 0
+    
+    async def flush():
+        nonlocal records, rejected
+        result = await bulk_upsert_tickets(db, records)
+        await db.commit()
+        if result.inserted or result.updated:
+            await invalidate_tags(tenant.id, "tickets")
+        
+        try:
+            enqueued = await enqueue_analysis_bulk(result.analysis_ids, tenant.id)
+        except Exception as e:
+            # The tickets stay pending; the analysis consumer's sweep re-enqueues them
+            logger.warning(f"Failed to enqueue bulk analysis for {len(result.analysis_ids)} tickets: {e}")
+            enqueued = 0
+        
+        batches.append({
+            "batch": len(batches) + 1,
+            "received": result.received + rejected,
+            "inserted": result.inserted,
+            "updated": result.updated,
+            "rejected": rejected,
+            "analysis_enqueued": enqueued
+        })
+        records = []
+        rejected = 0
+    
+    try:
+        async for line in iter_ndjson_lines(request):
+            line_number += 1
+            try:
+                payload = json.loads(line)
+                records.append(staging_record(line_number, tenant.id, normalize(payload)))
+            except Exception as e:
+                rejected += 1
+                if len(errors) < 20:
+                    errors.append({"line": line_number, "error": str(e)})
+            
+            if len(records) >= batch_size:
+                await flush()
+        
+        if records or rejected:
+            await flush()
+            
+    except Exception as e:
+        logger.error(f"Bulk ingest error for tenant {tenant.id} at line {line_number}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    logger.info(f"Bulk ingested {line_number} lines from {source} for tenant {tenant.id}")
+    
+    return {
+        "status": "accepted",
+        "source": source,
+        "batches": batches,
+        "totals": {
+            key: sum(batch[key] for batch in batches)
+            for key in ("received", "inserted", "updated", "rejected", "analysis_enqueued")
+        },
+        "errors": errors
+    }
+
+
+@router.get("/status/{ticket_id}")
+async def get_analysis_status(
+    ticket_id: uuid.UUID,
+    tenant: Tenant = Depends(get_tenant_from_webhook),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Check AI analysis progress for a ticket accepted by a webhook
+    
+    Headers required:
+    - X-Tenant-ID: Your tenant UUID
+    """
+    result = await db.execute(
+        select(
+            Ticket.id,
+            Ticket.ai_status,
+            Ticket.ai_analyzed_at,
+            Ticket.ai_summary,
+            Ticket.ai_intent,
+            Ticket.ai_category,
+            Ticket.ai_sentiment,
+            Ticket.ai_priority
+        ).where(
+            Ticket.id == ticket_id,
+            Ticket.tenant_id == tenant.id
+        )
+    )
+    row = result.first()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    
+    response = {
+        "ticket_id": str(row.id),
+        "analysis_status": row.ai_status,
+        "analyzed_at": row.ai_analyzed_at.isoformat() if row.ai_analyzed_at else None
+    }
+    
+    if row.ai_status == "completed":
+        response["ai_analysis"] = {
+            "summary": row.ai_summary,
+            "intent": row.ai_intent,
+            "category": row.ai_category,
+            "sentiment": row.ai_sentiment,
+            "suggested_priority": row.ai_priority
+        }
+    
+    return response
@@ -3,7 +3,7 @@ from typing import List
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.workflows import Workflow as WorkflowModel
 
 router = APIRouter()
@@ -26,7 +26,7 @@ class WorkflowStats(BaseModel):
     avg_success_rate: float
 
 @router.get("/", response_model=List[Workflow])
-async def get_workflows(db: AsyncSession = Depends(get_db)):
+async def get_workflows(db: AsyncSession = Depends(get_read_db)):
     """Get all automation workflows"""
     result = await db.execute(select(WorkflowModel))
     workflows = result.scalars().all()
@@ -46,7 +46,7 @@ async def get_workflows(db: AsyncSession = Depends(get_db)):
     ]
 
 @router.get("/stats", response_model=WorkflowStats)
-async def get_workflow_stats(db: AsyncSession = Depends(get_db)):
+async def get_workflow_stats(db: AsyncSession = Depends(get_read_db)):
     """Get workflow statistics"""
     # Get total count
     total_result = await db.execute(select(func.count(WorkflowModel.id)))
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from app.consumers.redis_consumer import TICKETS_STREAM
+from app.consumers.stream_consumer import StreamConsumer, entry_id_key, oldest_unfinished_id
+from app.core.config import get_settings
+from app.services.analysis_queue import ANALYSIS_STREAM, ANALYSIS_GROUP, REQUEUE_BATCH_SIZE, requeue_lost_jobs
+from app.services.analysis_writer import analysis_writer
+from app.services.ticket_service import analysis_update, analysis_update_params, ticket_service
+import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+class AnalysisConsumer(StreamConsumer):
+    """
+    Worker tier for tickets accepted by the webhooks.
+
+    Reads analysis jobs from the Redis Stream as part of a consumer group,
+    so several processes can share the backlog and jobs survive restarts.
+
+    Maintenance also re-enqueues tickets whose job was lost: still pending,
+    and last written before the oldest job either stream has yet to finish.
+    """
+    stream = ANALYSIS_STREAM
+    group = ANALYSIS_GROUP
+
+    async def handle(self, entry_id: str, fields: dict):
+        ticket_id = fields.get("ticket_id")
+        if not ticket_id:
+            logger.warning(f"Analysis job {entry_id} has no ticket_id")
+            return
+        await ticket_service.analyze_and_store(ticket_id)
+
+    async def on_dead_letter(self, entry_id: str, fields: dict):
+        # Mark it failed so the lost-job sweep doesn't re-enqueue it
+        ticket_id = fields.get("ticket_id")
+        if ticket_id:
+            values = {"ai_status": "failed"}
+            await analysis_writer.submit(analysis_update(tuple(values)), analysis_update_params(ticket_id, values))
+
+    async def maintain(self, client):
+        await super().maintain(client)
+        await self.requeue_lost(client)
+
+    async def requeue_lost(self, client) -> int:
+        unfinished = [
+            entry_id_key(entry_id)[0]
+            for entry_id in [await oldest_unfinished_id(client, stream) for stream in (ANALYSIS_STREAM, TICKETS_STREAM)]
+            if entry_id
+        ]
+        horizon = datetime.utcfromtimestamp(min(unfinished) / 1000) if unfinished else datetime.utcnow()
+        before = horizon - timedelta(seconds=settings.ANALYSIS_REQUEUE_GRACE_SECONDS)
+
+        requeued = 0
+        while self.is_running:
+            batch = await requeue_lost_jobs(before)
+            requeued += batch
+            if batch < REQUEUE_BATCH_SIZE:
+                break
+        return requeued
+
+analysis_consumer = AnalysisConsumer(concurrency=settings.CONSUMER_CONCURRENCY)
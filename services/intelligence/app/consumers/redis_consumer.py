@@ -1,66 +1,68 @@
-import asyncio
 import json
-from app.core.redis import redis_client
+from app.consumers.stream_consumer import StreamConsumer
+from app.core.config import get_settings
+from app.services.analysis_writer import analysis_writer
 from app.services.llm_service import llm_service
-from app.services.ticket_service import ticket_service
+from app.services.ticket_service import analysis_update, analysis_update_params, ticket_service
 from app.models.ticket import AnalysisResult
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
-class RedisConsumer:
-    def __init__(self):
-        self.is_running = False
+TICKETS_STREAM = "tickets:new"
+TICKETS_GROUP = "intelligence"
 
-    async def start(self):
-        self.is_running = True
-        client = await redis_client.get_client()
-        pubsub = client.pubsub()
-        await pubsub.subscribe("tickets:new")
-        
-        logger.info("Started listening for tickets:new...")
+class RedisConsumer(StreamConsumer):
+    """
+    Consumes tickets the ingestion service appends to the tickets:new stream.
+
+    The Go service XADDs each ticket as JSON in a "data" field.
+    """
+    stream = TICKETS_STREAM
+    group = TICKETS_GROUP
 
-        while self.is_running:
-            try:
-                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                if message:
-                    await self.process_message(message)
-                await asyncio.sleep(0.1)
-            except Exception as e:
-                logger.error(f"Error in Redis consumer loop: {e}")
-                await asyncio.sleep(5) # Backoff on error
+    async def handle(self, entry_id: str, fields: dict):
+        await self.process_message(fields)
 
-    async def stop(self):
-        self.is_running = False
-        logger.info("Stopping Redis consumer...")
+    async def on_dead_letter(self, entry_id: str, fields: dict):
+        # Mark it failed so the lost-job sweep doesn't re-enqueue it
+        try:
+            ticket_id = json.loads(fields["data"]).get("id")
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return
+        if ticket_id:
+            values = {"ai_status": "failed"}
+            await analysis_writer.submit(analysis_update(tuple(values)), analysis_update_params(ticket_id, values))
 
     async def process_message(self, message):
         try:
-            # Ingestion service publishes the raw ticket JSON
+            # Ingestion service appends the raw ticket JSON
             ticket_data = json.loads(message["data"])
-            
-            ticket_id = ticket_data.get("id")
-            title = ticket_data.get("title")
-            description = ticket_data.get("description")
-            
-            if not ticket_id or not title:
-                logger.warning("Received invalid ticket data")
-                return
+        except (KeyError, TypeError, ValueError) as e:
+            # Malformed entries can't succeed on retry; let them be acknowledged
+            logger.warning(f"Received unreadable ticket message: {e}")
+            return
+        
+        ticket_id = ticket_data.get("id")
+        title = ticket_data.get("title")
+        description = ticket_data.get("description")
+        
+        if not ticket_id or not title:
+            logger.warning("Received invalid ticket data")
+            return
 
-            logger.info(f"Processing ticket {ticket_id}: {title}")
-            
-            # Analyze with LLM
-            analysis_dict = await llm_service.analyze_ticket({
-                "title": title,
-                "description": description
-            })
-            
-            analysis_result = AnalysisResult(**analysis_dict)
-            
-            # Update DB
-            await ticket_service.update_ticket_analysis(ticket_id, analysis_result)
-                
-        except Exception as e:
-            logger.error(f"Failed to process message: {e}")
+        logger.info(f"Processing ticket {ticket_id}: {title}")
+        
+        # LLM and DB errors propagate so the entry stays pending and is retried
+        analysis_dict = await llm_service.analyze_ticket({
+            "title": title,
+            "description": description
+        }, fallback=False)
+        
+        analysis_result = AnalysisResult(**analysis_dict)
+        
+        # Update DB
+        await ticket_service.update_ticket_analysis(ticket_id, analysis_result, ticket_data.get("tenant_id"))
 
-redis_consumer = RedisConsumer()
+redis_consumer = RedisConsumer(concurrency=settings.CONSUMER_CONCURRENCY)
@@ -0,0 +1,306 @@
+import asyncio
+import os
+import socket
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+from redis.exceptions import ResponseError
+from app.core.redis import redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Releases the current entry's concurrency slot (set per entry task)
+_entry_slot: ContextVar[Optional[Callable[[], None]]] = ContextVar("stream_entry_slot", default=None)
+
+
+def release_slot():
+    """
+    Give the calling entry's concurrency slot back before it finishes.
+
+    For handlers that are done with their own work and only wait on
+    something shared, such as a batched write: the next entry can start
+    instead of the slot idling. The entry is still acknowledged when the
+    handler returns. No-op outside a consumer task.
+    """
+    release = _entry_slot.get()
+    if release is not None:
+        release()
+
+
+def entry_id_key(entry_id: str):
+    """Sortable form of a stream entry ID ("<ms>-<seq>")"""
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+async def oldest_unfinished_id(client, stream: str) -> Optional[str]:
+    """
+    Oldest entry some consumer group has not acknowledged yet.
+
+    That is the group's oldest pending entry, or else the first entry after
+    its last-delivered ID. Returns None when every group has acknowledged
+    everything (or the stream has no groups).
+    """
+    try:
+        groups = await client.xinfo_groups(stream)
+    except ResponseError:
+        # Stream doesn't exist yet
+        return None
+    candidates = []
+    for group in groups:
+        if group["pending"]:
+            summary = await client.xpending(stream, group["name"])
+            candidates.append(summary["min"])
+        else:
+            undelivered = await client.xrange(stream, min=f"({group['last-delivered-id']}", count=1)
+            if undelivered:
+                candidates.append(undelivered[0][0])
+    return min(candidates, key=entry_id_key) if candidates else None
+
+class StreamConsumer:
+    """
+    Base class for Redis Stream consumer-group workers.
+
+    Entries are read with a blocking XREADGROUP, so idle workers cost no
+    polling, and every process joins the same group under its own consumer
+    name to share the load. An entry is acknowledged only once `handle`
+    succeeds. Failed entries stay pending and, like entries left by a worker
+    that died mid-batch, are taken over with XAUTOCLAIM once they have been
+    idle for `claim_idle_ms`, which retries them with that delay. After
+    `max_deliveries` attempts an entry is moved to the `<stream>:dead`
+    stream and acknowledged, so a poison entry can't cycle forever.
+
+    Up to `concurrency` entries are handled at once, each in its own task.
+    When every slot is busy the loop stops reading until one frees up, so a
+    slow LLM backs pressure up into the stream instead of into memory.
+    Handlers can free their slot early with release_slot(), e.g. while they
+    wait on a batched write; those entries still count towards
+    `max_in_flight`, which bounds what is held in memory.
+
+    Every `maintenance_interval` seconds one process (per stream) trims
+    entries all groups have acknowledged with XTRIM MINID. Producers don't
+    cap the stream with MAXLEN, which would drop jobs nobody had read yet.
+
+    Subclasses set `stream` and `group` and implement `handle`.
+    """
+    stream: str = ""
+    group: str = ""
+
+    def __init__(
+        self,
+        batch_size: int = 10,
+        block_ms: int = 5000,
+        claim_idle_ms: int = 60000,
+        claim_interval: float = 30.0,
+        maintenance_interval: float = 300.0,
+        max_deliveries: int = 5,
+        concurrency: int = 1,
+        max_in_flight: Optional[int] = None
+    ):
+        self.is_running = False
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_in_flight = max_in_flight or concurrency * 16
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.maintenance_interval = maintenance_interval
+        self.max_deliveries = max_deliveries
+        self.dead_stream = f"{self.stream}:dead"
+        self.failed = 0
+        self.dead_lettered = 0
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+        self._last_claim = 0.0
+        self._last_maintenance = 0.0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._busy = 0
+        self._tasks = set()
+
+    async def ensure_group(self, client):
+        try:
+            await client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            # BUSYGROUP: another worker already created it
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def start(self):
+        self.is_running = True
+        client = await redis_client.get_client()
+        await self.ensure_group(client)
+
+        logger.info(f"Started consuming {self.stream} as {self.consumer_name}...")
+
+        while self.is_running:
+            try:
+                if time.monotonic() - self._last_claim >= self.claim_interval:
+                    await self.claim_stale(client)
+                if time.monotonic() - self._last_maintenance >= self.maintenance_interval:
+                    await self.run_maintenance(client)
+
+                if len(self._tasks) >= self.max_in_flight:
+                    await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                # Only read as many entries as there are free slots
+                free = max(1, self.concurrency - self._busy)
+                response = await client.xreadgroup(
+                    self.group,
+                    self.consumer_name,
+                    {self.stream: ">"},
+                    count=min(self.batch_size, free),
+                    block=self.block_ms
+                )
+                for _stream, entries in response or []:
+                    for entry_id, fields in entries:
+                        await self.dispatch(client, entry_id, fields)
+            except Exception as e:
+                logger.error(f"Error in {self.stream} consumer loop: {e}")
+                await asyncio.sleep(5) # Backoff on error
+
+        # Let in-flight entries finish so they get acknowledged
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def stop(self):
+        self.is_running = False
+        logger.info(f"Stopping {self.stream} consumer...")
+
+    async def dispatch(self, client, entry_id: str, fields: dict):
+        """Handle an entry in the background once a slot is free"""
+        await self._slots.acquire()
+        self._busy += 1
+        task = asyncio.create_task(self._run(client, entry_id, fields))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, client, entry_id: str, fields: dict):
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self._busy -= 1
+                self._slots.release()
+
+        # Each task runs in its own copy of the context
+        _entry_slot.set(release)
+        try:
+            await self.process_entry(client, entry_id, fields)
+        finally:
+            release()
+
+    def stats(self) -> dict:
+        return {
+            "stream": self.stream,
+            "in_flight": len(self._tasks),
+            "busy_slots": self._busy,
+            "concurrency": self.concurrency,
+            "failed": self.failed,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    async def claim_stale(self, client):
+        """Take over and process entries other consumers left pending"""
+        self._last_claim = time.monotonic()
+        start_id = "0-0"
+        while self.is_running:
+            response = await client.xautoclaim(
+                self.stream,
+                self.group,
+                self.consumer_name,
+                min_idle_time=self.claim_idle_ms,
+                start_id=start_id,
+                count=self.batch_size
+            )
+            start_id, entries = response[0], response[1]
+            if entries:
+                logger.info(f"Reclaimed {len(entries)} stale entries from {self.stream}")
+            deliveries = await self.delivery_counts(client, entries)
+            for entry_id, fields in entries:
+                # Entries trimmed from the stream come back without fields
+                if not fields:
+                    await client.xack(self.stream, self.group, entry_id)
+                elif deliveries.get(entry_id, 0) > self.max_deliveries:
+                    await self.dead_letter(client, entry_id, fields, deliveries[entry_id])
+                else:
+                    await self.dispatch(client, entry_id, fields)
+            if start_id == "0-0":
+                break
+
+    async def run_maintenance(self, client):
+        """Run maintain() if no other process has this interval"""
+        self._last_maintenance = time.monotonic()
+        lock = f"{self.stream}:maintenance"
+        if not await client.set(lock, self.consumer_name, nx=True, ex=max(1, int(self.maintenance_interval))):
+            return
+        try:
+            await self.maintain(client)
+        except Exception as e:
+            logger.error(f"{self.stream} maintenance failed: {e}")
+
+    async def maintain(self, client):
+        await self.trim_acknowledged(client)
+
+    async def trim_acknowledged(self, client) -> int:
+        """Drop entries every group has acknowledged"""
+        boundary = await oldest_unfinished_id(client, self.stream)
+        if boundary is None:
+            groups = await client.xinfo_groups(self.stream)
+            if not groups:
+                return 0
+            # Everything is acknowledged; keep the last delivered entry
+            boundary = min((group["last-delivered-id"] for group in groups), key=entry_id_key)
+        trimmed = await client.xtrim(self.stream, minid=boundary, approximate=True)
+        if trimmed:
+            logger.info(f"Trimmed {trimmed} acknowledged entries from {self.stream}")
+        return trimmed
+
+    async def delivery_counts(self, client, entries) -> dict:
+        """Times each claimed entry has been delivered (XAUTOCLAIM counts as one)"""
+        if not entries:
+            return {}
+        # One exact lookup per id: a range query would also return this
+        # consumer's other pending entries between them and cut off some ids
+        pipe = client.pipeline(transaction=False)
+        for entry_id, _ in entries:
+            pipe.xpending_range(self.stream, self.group, min=entry_id, max=entry_id, count=1)
+        counts = {}
+        for pending in await pipe.execute():
+            for item in pending:
+                counts[item["message_id"]] = item["times_delivered"]
+        return counts
+
+    async def dead_letter(self, client, entry_id: str, fields: dict, deliveries: int):
+        """Retire an entry that kept failing: copy it to the dead stream and ack it"""
+        await client.xadd(self.dead_stream, {
+            **fields,
+            "source_id": entry_id,
+            "group": self.group,
+            "deliveries": deliveries,
+        })
+        await client.xack(self.stream, self.group, entry_id)
+        self.dead_lettered += 1
+        logger.error(f"Moved {self.stream} entry {entry_id} to {self.dead_stream} after {deliveries} deliveries")
+        try:
+            await self.on_dead_letter(entry_id, fields)
+        except Exception as e:
+            logger.error(f"Dead-letter hook failed for {self.stream} entry {entry_id}: {e}")
+
+    async def on_dead_letter(self, entry_id: str, fields: dict):
+        """Called after an entry is dead-lettered"""
+
+    async def process_entry(self, client, entry_id: str, fields: dict):
+        try:
+            await self.handle(entry_id, fields)
+        except Exception as e:
+            # Left pending: claim_stale retries it after claim_idle_ms
+            self.failed += 1
+            logger.error(f"Failed to process {self.stream} entry {entry_id}: {e}")
+            return
+        await client.xack(self.stream, self.group, entry_id)
+
+    async def handle(self, entry_id: str, fields: dict):
+        raise NotImplementedError
@@ -0,0 +1,130 @@
+"""
+API key issuing and verification.
+
+Keys look like `avk_<prefix>_<secret>`. The prefix is public and has a
+unique index, so authenticating is one (cached) lookup by prefix and then a
+constant-time comparison of HMAC-SHA256(server secret, key) against the
+stored hash. Keys are long random strings, so unlike passwords they don't
+need a slow hash like bcrypt on every call.
+
+last_used_at is only tracked in memory per request; LastUsedRecorder writes
+the latest timestamps in one batch every API_KEY_LAST_USED_FLUSH_SECONDS.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import principal_cache
+from app.core.config import get_settings
+from app.models.tenant import APIKey
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+KEY_SCHEME = "avk"
+PREFIX_BYTES = 6  # 12 hex characters
+SECRET_BYTES = 32
+
+
+def _hmac_secret() -> bytes:
+    return (settings.API_KEY_HMAC_SECRET or settings.JWT_SECRET_KEY).encode()
+
+
+def hash_api_key(raw_key: str) -> str:
+    """HMAC-SHA256 of the full key, as stored in api_keys.key_hash"""
+    return hmac.new(_hmac_secret(), raw_key.encode(), hashlib.sha256).hexdigest()
+
+
+def generate_api_key() -> Tuple[str, str, str]:
+    """
+    Create a new key.
+
+    Returns:
+        (raw key to show once, public prefix, key hash to store)
+    """
+    prefix = secrets.token_hex(PREFIX_BYTES)
+    raw_key = f"{KEY_SCHEME}_{prefix}_{secrets.token_urlsafe(SECRET_BYTES)}"
+    return raw_key, prefix, hash_api_key(raw_key)
+
+
+def key_prefix(raw_key: str) -> Optional[str]:
+    """Public prefix of a well-formed key, else None"""
+    scheme, _, rest = raw_key.partition("_")
+    prefix, _, secret = rest.partition("_")
+    if scheme != KEY_SCHEME or len(prefix) != PREFIX_BYTES * 2 or not secret:
+        return None
+    return prefix
+
+
+async def authenticate_api_key(db: AsyncSession, raw_key: str) -> Optional[APIKey]:
+    """
+    Look up and verify a presented key.
+
+    Returns:
+        The APIKey row, or None if the key is unknown, wrong or expired
+    """
+    prefix = key_prefix(raw_key)
+    if prefix is None:
+        return None
+
+    api_key = await principal_cache.get_api_key(db, prefix)
+    if api_key is None or not hmac.compare_digest(api_key.key_hash, hash_api_key(raw_key)):
+        return None
+    if api_key.expires_at is not None and api_key.expires_at <= datetime.utcnow():
+        return None
+
+    last_used_recorder.record(api_key.id)
+    return api_key
+
+
+class LastUsedRecorder:
+    """Buffers last_used_at per key and writes them periodically"""
+
+    def __init__(self, flush_interval: float = 60):
+        self.flush_interval = flush_interval
+        self.flushes = 0
+        self._pending: Dict[object, datetime] = {}
+        self._timer: Optional[asyncio.Task] = None
+
+    def record(self, key_id):
+        self._pending[key_id] = datetime.utcnow()
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Write the buffered timestamps in one executemany"""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        from app.core.database import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(APIKey),
+                    [{"id": key_id, "last_used_at": used_at} for key_id, used_at in pending.items()]
+                )
+                await session.commit()
+            self.flushes += 1
+        except Exception as e:
+            # Best effort; a later use records a newer timestamp anyway
+            logger.warning(f"Failed to write last_used_at for {len(pending)} API keys: {e}")
+
+    def stats(self) -> Dict:
+        return {"flushes": self.flushes, "pending": len(self._pending)}
+
+
+last_used_recorder = LastUsedRecorder(flush_interval=settings.API_KEY_LAST_USED_FLUSH_SECONDS)
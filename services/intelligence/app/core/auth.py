@@ -4,39 +4,38 @@ Authentication and authorization utilities
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import get_db
+from app.core import principal_cache
+from app.core.api_keys import authenticate_api_key
+from app.core.passwords import password_hasher
 from app.models.tenant import User, Tenant
-from sqlalchemy import select
 
 settings = get_settings()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # JWT settings
 SECRET_KEY = settings.JWT_SECRET_KEY or "your-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-# Security scheme
+# Security schemes
 security = HTTPBearer()
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (on the password hashing pool)"""
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    """Hash a password (on the password hashing pool)"""
+    return await password_hasher.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -61,7 +60,27 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
+def token_claims(request: Request, token: str) -> dict:
+    """
+    Claims of the request's access token.
+    
+    Reuses what TenantContextMiddleware decoded; only decodes here when the
+    middleware didn't run.
+    
+    Raises:
+        jwt.InvalidTokenError: If the token is invalid
+    """
+    state = request.scope.get("state", {})
+    if "token_claims" in state:
+        claims = state["token_claims"]
+        if claims is None:
+            raise jwt.InvalidTokenError("Invalid token")
+        return claims
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> User:
@@ -73,8 +92,7 @@ async def get_current_user(
     )
     
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_claims(request, credentials.credentials)
         user_id: str = payload.get("sub")
         tenant_id: str = payload.get("tenant_id")
         
@@ -84,11 +102,8 @@ async def get_current_user(
     except jwt.InvalidTokenError:
         raise credentials_exception
     
-    # Fetch user from database
-    result = await db.execute(
-        select(User).where(User.id == user_id, User.tenant_id == tenant_id)
-    )
-    user = result.scalar_one_or_none()
+    # Fetch user (principal cache, falling back to the database)
+    user = await principal_cache.get_user(db, user_id, tenant_id)
     
     if user is None:
         raise credentials_exception
@@ -107,10 +122,7 @@ async def get_current_tenant(
     db: AsyncSession = Depends(get_db)
 ) -> Tenant:
     """Get the current tenant from the authenticated user"""
-    result = await db.execute(
-        select(Tenant).where(Tenant.id == user.tenant_id)
-    )
-    tenant = result.scalar_one_or_none()
+    tenant = await principal_cache.get_tenant(db, user.tenant_id)
     
     if tenant is None:
         raise HTTPException(
@@ -127,6 +139,34 @@ async def get_current_tenant(
     return tenant
 
 
+async def get_api_key_tenant(
+    raw_key: Optional[str] = Depends(api_key_header),
+    db: AsyncSession = Depends(get_db)
+) -> Tenant:
+    """Get the tenant an X-API-Key header belongs to"""
+    if not raw_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing API key"
+        )
+    
+    api_key = await authenticate_api_key(db, raw_key)
+    if api_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    tenant = await principal_cache.get_tenant(db, api_key.tenant_id)
+    if tenant is None or tenant.status != 'active':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tenant account is not active"
+        )
+    
+    return tenant
+
+
 def require_role(required_role: str):
     """Dependency to require a specific role"""
     async def role_checker(user: User = Depends(get_current_user)):
@@ -2,62 +2,348 @@
 Redis caching utilities for API endpoints.
 Reduces database load by 80-90%.
 """
+from collections import OrderedDict
 from functools import wraps
+import asyncio
+import inspect
 import json
-from typing import Optional, Callable, Any
+import time
+from typing import Optional, Callable, Any, Dict, Iterable, List, Tuple
 import hashlib
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.redis import redis_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Name of the Request parameter the decorator injects into the route signature
+REQUEST_PARAM = "_cache_request"
 
-def cache_key(*args, **kwargs) -> str:
-    """Generate cache key from function arguments."""
-    key_data = f"{args}:{sorted(kwargs.items())}"
-    return hashlib.md5(key_data.encode()).hexdigest()
+# Upper bound on a stale-while-revalidate refresh holding its lock
+REFRESH_LOCK_TTL = 60
 
+# Strong references to running background refreshes
+_background_refreshes = set()
 
-def redis_cache(prefix: str, ttl: int = 300):
+
+def normalize_param(value: Any) -> str:
+    """Stable string form of a query parameter value"""
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(sorted(normalize_param(item) for item in value))
+    if isinstance(value, str):
+        return value.strip().lower()
+    return str(value)
+
+
+def cache_key(
+    prefix: str,
+    tenant_id: Optional[str],
+    params: Optional[Dict[str, Any]] = None,
+    versions: Optional[Dict[str, int]] = None
+) -> str:
+    """
+    Build a cache key from explicit inputs.
+    
+    Args:
+        prefix: Cache key prefix (e.g., 'analytics:summary')
+        tenant_id: Tenant the response belongs to (None for unauthenticated calls)
+        params: Query parameters that change the response
+        versions: Current version of each tag the response depends on
+    
+    Returns:
+        Key of the form '{prefix}:tenant:{tenant_id}:{params hash}'
+    """
+    normalized = sorted((name, normalize_param(value)) for name, value in (params or {}).items())
+    normalized += sorted((f"@{tag}", str(version)) for tag, version in (versions or {}).items())
+    digest = hashlib.md5(json.dumps(normalized).encode()).hexdigest()
+    return f"{prefix}:tenant:{tenant_id or 'anonymous'}:{digest}"
+
+
+# Tag versions: every cached entry tagged e.g. 'tickets' embeds the tenant's
+# current tickets version in its key. Bumping the version orphans all of
+# them at once in O(1); the orphans expire by their TTL.
+TAG_VERSION_PREFIX = "cache:version"
+
+# Local caches to clear in this process when a tag is invalidated
+_local_caches_by_tag: Dict[str, List["LocalCache"]] = {}
+
+
+def tag_version_key(tenant_id: Optional[str], tag: str) -> str:
+    return f"{TAG_VERSION_PREFIX}:tenant:{tenant_id or 'anonymous'}:{tag}"
+
+
+async def get_tag_versions(tenant_id: Optional[str], tags: Iterable[str]) -> Dict[str, int]:
+    """Current version of each tag for a tenant (0 if never invalidated)"""
+    tags = list(tags)
+    if not tags:
+        return {}
+    client = await redis_client.get_client()
+    values = await client.mget([tag_version_key(tenant_id, tag) for tag in tags])
+    return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+
+async def invalidate_tags(tenant_id: Any, *tags: str):
+    """
+    Invalidate every cached response tagged with `tags` for a tenant.
+    
+    O(1) per tag: bumps the tag's version instead of finding keys.
+    Entries in other processes' local caches live out their (short) local TTL.
+    
+    Args:
+        tenant_id: Tenant whose data changed
+        tags: Tags to invalidate (e.g., 'tickets')
+    """
+    tenant_id = str(tenant_id) if tenant_id else None
+    for tag in tags:
+        for local in _local_caches_by_tag.get(tag, []):
+            local.clear()
+    
+    try:
+        client = await redis_client.get_client()
+        pipe = client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(tag_version_key(tenant_id, tag))
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Cache tag invalidation error for tenant {tenant_id} {tags}: {e}")
+
+
+class LocalCache:
+    """
+    In-process LRU with a per-entry TTL.
+    
+    Sits in front of Redis to skip the round trip and JSON decode for hot
+    keys. Keep the TTL short: other processes can't invalidate it.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        self._entries.clear()
+
+
+def redis_cache(
+    prefix: str,
+    ttl: int = 300,
+    vary: Iterable[str] = (),
+    local_ttl: Optional[float] = None,
+    local_max_entries: int = 1024,
+    single_flight: bool = True,
+    tags: Iterable[str] = (),
+    stale_ttl: Optional[int] = None,
+    per_tenant: bool = True
+):
     """
-    Decorator to cache function results in Redis.
+    Decorator to cache route results in Redis, per tenant.
+    
+    Only the tenant (from the auth context set by TenantContextMiddleware)
+    and the parameters named in `vary` make up the key; injected
+    dependencies such as the DB session are ignored. The tenant comes from
+    the token's claims, so per-tenant routes must depend on
+    get_current_tenant (which checks them) and scope their queries to it.
     
     Args:
         prefix: Cache key prefix (e.g., 'dashboard:kpis')
         ttl: Time to live in seconds (default: 5 minutes)
+        vary: Route parameters that change the response (e.g., ('days',))
+        local_ttl: Also keep results in an in-process LRU for this many
+            seconds (default: off)
+        local_max_entries: Size cap of the in-process LRU
+        single_flight: Concurrent misses for the same key in this process
+            share one Redis read and one computation, run on its own DB
+            session in place of any AsyncSession argument
+        tags: Data the response depends on (e.g., ('tickets',)); entries
+            are dropped when invalidate_tags() is called for the tenant.
+            Writers only invalidate their own tenant, so tagged routes must
+            return that tenant's data only; calls without a tenant bypass
+            the cache
+        stale_ttl: Stale-while-revalidate window. Once `ttl` (the soft TTL)
+            passes, entries are still served for up to this many more
+            seconds while one background task recomputes them. The refresh
+            gets its own DB session in place of any AsyncSession argument.
+        per_tenant: Key entries by tenant (default). Off for responses that
+            are the same for every tenant, which then share one entry.
     """
+    vary = tuple(vary)
+    tags = tuple(tags)
+    
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def wrapper(*args, **kwargs) -> Any:
-            # Generate cache key
-            key_suffix = cache_key(*args, **kwargs)
-            cache_key_full = f"{prefix}:{key_suffix}"
+        signature = inspect.signature(func)
+        unknown = set(vary) - set(signature.parameters)
+        if unknown:
+            raise ValueError(f"{func.__name__} has no parameters {sorted(unknown)} to vary the cache on")
+        if tags and not per_tenant:
+            raise ValueError(f"{func.__name__}: tag invalidation is per tenant, so tags need per_tenant=True")
+        
+        local = LocalCache(local_ttl, local_max_entries) if local_ttl else None
+        if local:
+            for tag in tags:
+                _local_caches_by_tag.setdefault(tag, []).append(local)
+        in_flight: Dict[str, asyncio.Future] = {}
+        
+        async def compute(cache_key_full: str, local_key: str, args, kwargs) -> Any:
+            result = await func(*args, **kwargs)
+            encoded = jsonable_encoder(result)  # Pydantic models, datetimes, UUIDs
+            if local:
+                local.set(local_key, encoded)
             
+            # Store in cache
+            try:
+                client = await redis_client.get_client()
+                if stale_ttl:
+                    entry = {"value": encoded, "fresh_until": time.time() + ttl}
+                    await client.setex(cache_key_full, ttl + stale_ttl, json.dumps(entry))
+                else:
+                    await client.setex(cache_key_full, ttl, json.dumps(encoded))
+            except Exception as e:
+                logger.warning(f"Cache write error: {e}")
+            
+            return result
+        
+        async def on_own_session(step: Callable, cache_key_full: str, local_key: str, args, kwargs) -> Any:
+            """
+            Run `step` with a fresh read session in place of any AsyncSession
+            argument, so the work doesn't depend on one request's session.
+            Cached endpoints only read, so it comes from the read pool.
+            """
+            from app.core.database import ReadSessionLocal
+            
+            async with ReadSessionLocal() as session:
+                args = [session if isinstance(arg, AsyncSession) else arg for arg in args]
+                kwargs = {
+                    name: session if isinstance(value, AsyncSession) else value
+                    for name, value in kwargs.items()
+                }
+                return await step(cache_key_full, local_key, args, kwargs)
+        
+        async def refresh(cache_key_full: str, local_key: str, args, kwargs):
+            """Recompute a stale entry after the triggering request has returned"""
+            try:
+                # The request's own session is closed once it responds
+                await on_own_session(compute, cache_key_full, local_key, args, kwargs)
+                logger.info(f"Cache REFRESHED: {cache_key_full}")
+            except Exception as e:
+                logger.warning(f"Cache refresh error for {cache_key_full}: {e}")
+            finally:
+                try:
+                    client = await redis_client.get_client()
+                    await client.delete(f"{cache_key_full}:refresh")
+                except Exception:
+                    pass
+        
+        async def schedule_refresh(client, cache_key_full: str, local_key: str, args, kwargs):
+            # One refresh per key across all processes
+            if not await client.set(f"{cache_key_full}:refresh", "1", nx=True, ex=REFRESH_LOCK_TTL):
+                return
+            task = asyncio.create_task(refresh(cache_key_full, local_key, args, kwargs))
+            _background_refreshes.add(task)
+            task.add_done_callback(_background_refreshes.discard)
+        
+        async def load(cache_key_full: str, local_key: str, args, kwargs) -> Any:
             # Try to get from cache
             try:
-                cached = await redis_client.get(cache_key_full)
+                client = await redis_client.get_client()
+                cached = await client.get(cache_key_full)
                 if cached:
-                    logger.info(f"Cache HIT: {cache_key_full}")
-                    return json.loads(cached)
+                    value = json.loads(cached)
+                    if stale_ttl:
+                        if value["fresh_until"] < time.time():
+                            logger.info(f"Cache STALE: {cache_key_full}")
+                            await schedule_refresh(client, cache_key_full, local_key, args, kwargs)
+                        else:
+                            logger.info(f"Cache HIT: {cache_key_full}")
+                        value = value["value"]
+                    else:
+                        logger.info(f"Cache HIT: {cache_key_full}")
+                    if local:
+                        local.set(local_key, value)
+                    return value
             except Exception as e:
                 logger.warning(f"Cache read error: {e}")
             
             # Cache miss - execute function
             logger.info(f"Cache MISS: {cache_key_full}")
-            result = await func(*args, **kwargs)
+            return await compute(cache_key_full, local_key, args, kwargs)
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            request: Optional[Request] = kwargs.pop(REQUEST_PARAM, None)
+            tenant_id = getattr(request.state, "tenant_id", None) if request and per_tenant else None
             
-            # Store in cache
-            try:
-                await redis_client.setex(
-                    cache_key_full,
-                    ttl,
-                    json.dumps(result, default=str)  # default=str for datetime serialization
-                )
-            except Exception as e:
-                logger.warning(f"Cache write error: {e}")
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            params = {name: bound.arguments.get(name) for name in vary}
             
-            return result
+            # Nothing invalidates tags for a missing tenant
+            if tags and tenant_id is None:
+                return await func(*args, **kwargs)
+            
+            # Local entries are cleared directly on invalidation, so they
+            # don't need the tag versions in their key
+            local_key = cache_key(prefix, tenant_id, params)
+            if local:
+                value = local.get(local_key)
+                if value is not None:
+                    return value
+            
+            cache_key_full = local_key
+            if tags:
+                try:
+                    versions = await get_tag_versions(tenant_id, tags)
+                    cache_key_full = cache_key(prefix, tenant_id, params, versions)
+                except Exception as e:
+                    logger.warning(f"Cache tag version read error: {e}")
+            
+            if not single_flight:
+                return await load(cache_key_full, local_key, args, kwargs)
+            
+            # Join a load already running for this key, or lead one. The
+            # leader gets its own session: it serves every caller, so it
+            # must not fail when the first caller's request goes away.
+            leader = in_flight.get(cache_key_full)
+            if leader is None:
+                leader = asyncio.ensure_future(on_own_session(load, cache_key_full, local_key, args, kwargs))
+                in_flight[cache_key_full] = leader
+                leader.add_done_callback(lambda _: in_flight.pop(cache_key_full, None))
+            
+            # Shielded so one caller disconnecting doesn't cancel the others' result
+            return await asyncio.shield(leader)
         
+        # Let FastAPI inject the request so the key can carry the tenant
+        wrapper.__signature__ = signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            ]
+        )
+        wrapper.local_cache = local
         return wrapper
     return decorator
 
@@ -66,13 +352,24 @@ async def invalidate_cache(pattern: str):
     """
     Invalidate cache keys matching pattern.
     
+    Walks the keyspace incrementally with SCAN, so unlike KEYS it doesn't
+    block Redis, but it is still O(keyspace). Prefer invalidate_tags().
+    
     Args:
         pattern: Redis key pattern (e.g., 'dashboard:*')
     """
     try:
-        keys = await redis_client.keys(pattern)
-        if keys:
-            await redis_client.delete(*keys)
-            logger.info(f"Invalidated {len(keys)} cache keys matching '{pattern}'")
+        client = await redis_client.get_client()
+        batch = []
+        deleted = 0
+        async for key in client.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                deleted += await client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await client.unlink(*batch)
+        if deleted:
+            logger.info(f"Invalidated {deleted} cache keys matching '{pattern}'")
     except Exception as e:
         logger.error(f"Cache invalidation error: {e}")
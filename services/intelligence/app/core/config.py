@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Aivora Intelligence Service"
@@ -7,15 +8,78 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     
+    # Connection pool of the shared engine (per process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    DB_COMMAND_TIMEOUT_SECONDS: float = 60.0
+    
+    # Optional read replica for analytics/reporting routes, with its own pool.
+    # Without it those routes use a separate pool on the primary.
+    DATABASE_READ_URL: Optional[str] = None
+    DB_READ_POOL_SIZE: int = 5
+    DB_READ_MAX_OVERFLOW: int = 5
+    
+    # Connections opened per pool at startup
+    DB_POOL_WARM_CONNECTIONS: int = 2
+    
+    # Apply pending migrations at startup instead of only warning; for local
+    # development. Deploys run `python -m app.migrate` explicitly.
+    AUTO_MIGRATE: bool = False
+    
     # Redis
     REDIS_URL: str
     
     # AI Provider
     GROQ_API_KEY: str
     
+    # LLM gateway: shared connection pool, concurrency cap and per-call timeout
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_CONNECTIONS: int = 20
+    
+    # Content-addressed cache of ticket analyses
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 10000
+    ANALYSIS_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    
+    # Webhook ingestion: "sync" runs the LLM inline before responding,
+    # "async" persists + enqueues and returns 202 (needs the consumers running)
+    WEBHOOK_ANALYSIS_MODE: Literal["sync", "async"] = "sync"
+    
+    # Stream consumers: tickets processed concurrently per consumer process
+    CONSUMER_CONCURRENCY: int = 8
+    
+    # Tickets still pending analysis this long after every earlier job was
+    # handled lost their job and are re-enqueued
+    ANALYSIS_REQUEUE_GRACE_SECONDS: int = 600
+    
+    # Run the consumers inside the API process. Set False for API-only
+    # processes when `python -m app.worker` runs them separately.
+    API_RUN_CONSUMERS: bool = True
+    WORKER_PROCESSES: int = 1
+    
+    # Analysis results are written in batches of up to N items or T ms
+    ANALYSIS_WRITE_BATCH_SIZE: int = 100
+    ANALYSIS_WRITE_MAX_DELAY_MS: int = 50
+    
     # Authentication
     JWT_SECRET_KEY: str = "your-secret-key-change-in-production"
     
+    # bcrypt hashes/verifies run at most this many at a time, off the event loop
+    PASSWORD_HASH_WORKERS: int = 4
+    
+    # API keys are verified with HMAC-SHA256 under this secret (defaults to
+    # JWT_SECRET_KEY); last_used_at is written in batches at this interval
+    API_KEY_HMAC_SECRET: str = ""
+    API_KEY_LAST_USED_FLUSH_SECONDS: int = 60
+    
+    # Cached user/tenant rows for auth: Redis TTL and in-process TTL
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = 5.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,54 +1,117 @@
 """
 Database connection and session management.
+
+This module owns the engines. Everything that talks to Postgres (API
+routes, stream consumers, the analysis worker, batch scripts) uses
+`engine` / `AsyncSessionLocal` from here, so each process holds one pool
+sized by the DB_POOL_* settings. Read-only reporting routes use
+`get_read_db`, backed by a separate pool (see read_engine).
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import exc
 from app.core.config import get_settings
+from typing import Dict
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Convert DATABASE_URL to async format if needed
-database_url = settings.DATABASE_URL
-
-# Fix protocol
-if database_url.startswith("postgresql://"):
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-elif database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql+asyncpg://", 1)
-
-# Remove sslmode and channel_binding if present (asyncpg doesn't support them)
-if "sslmode=" in database_url or "channel_binding=" in database_url:
-    database_url = database_url.replace("sslmode=require", "")
-    database_url = database_url.replace("sslmode=prefer", "")
-    database_url = database_url.replace("sslmode=disable", "")
-    database_url = database_url.replace("channel_binding=require", "")
-    database_url = database_url.replace("channel_binding=prefer", "")
-    database_url = database_url.replace("channel_binding=disable", "")
+def to_async_url(database_url: str) -> str:
+    """Convert a postgres:// DSN to the asyncpg format SQLAlchemy expects"""
+    # Fix protocol
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    elif database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql+asyncpg://", 1)
+    
+    # Remove sslmode and channel_binding if present (asyncpg doesn't support them)
+    if "sslmode=" in database_url or "channel_binding=" in database_url:
+        database_url = database_url.replace("sslmode=require", "")
+        database_url = database_url.replace("sslmode=prefer", "")
+        database_url = database_url.replace("sslmode=disable", "")
+        database_url = database_url.replace("channel_binding=require", "")
+        database_url = database_url.replace("channel_binding=prefer", "")
+        database_url = database_url.replace("channel_binding=disable", "")
+        
+        # Clean up potential double && or trailing ?
+        database_url = database_url.replace("?&", "?").replace("&&", "&")
+        if database_url.endswith("?") or database_url.endswith("&"):
+            database_url = database_url[:-1]
     
-    # Clean up potential double && or trailing ?
-    database_url = database_url.replace("?&", "?").replace("&&", "&")
-    if database_url.endswith("?") or database_url.endswith("&"):
-        database_url = database_url[:-1]
+    # Ensure ssl=require is present for Neon
+    if "ssl=" not in database_url:
+        separator = "&" if "?" in database_url else "?"
+        database_url += f"{separator}ssl=require"
+    
+    return database_url
+
 
-# Ensure ssl=require is present for Neon
-if "ssl=" not in database_url:
-    separator = "&" if "?" in database_url else "?"
-    database_url += f"{separator}ssl=require"
+# Convert DATABASE_URL to async format if needed
+database_url = to_async_url(settings.DATABASE_URL)
 
 # Debug: Print the final URL (remove in production)
 print(f"[DEBUG] Final DATABASE_URL: {database_url.split('@')[1] if '@' in database_url else 'invalid'}")
 
-# Create async engine
-engine = create_async_engine(
-    database_url,
-    echo=False,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10
-)
+# Read-only replica for dashboards; falls back to the primary
+read_database_url = to_async_url(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else database_url
+
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+
+def create_engine(url: str = None, **overrides) -> AsyncEngine:
+    """
+    The one engine factory for the API, consumers, worker and batch scripts.
+    
+    Pool size, overflow, recycle and timeouts come from Settings; keyword
+    overrides win (e.g. pool_size=1 for a one-off script).
+    """
+    options = dict(
+        echo=False,
+        poolclass=TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        connect_args={
+            "timeout": settings.DB_CONNECT_TIMEOUT_SECONDS,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT_SECONDS,
+        },
+    )
+    options.update(overrides)
+    return create_async_engine(url or database_url, **options)
+
+
+# Shared engine
+engine = create_engine()
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -57,25 +120,52 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Analytics-style reads get their own pool (on the replica when configured),
+# so long dashboard scans can't take every connection ingestion needs
+read_engine = create_engine(
+    read_database_url,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=settings.DB_READ_MAX_OVERFLOW,
+    execution_options={"postgresql_readonly": True}
+)
+
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 # Import Base from models (don't create duplicate)
 from app.models.database import Base
 
 
-async def init_db():
+async def init_db() -> Dict:
     """
-    Initialize database tables.
+    Check the schema version at startup.
+    
+    No DDL runs here (see app.core.migrations); if migrations are pending this
+    only warns, unless AUTO_MIGRATE is set.
     """
-    # Import all models so Base.metadata knows about them
-    from app.models.tenant import Tenant, User, APIKey, Integration
-    from app.models.ticket import Ticket, TicketComment
-    from app.models.executive import FinancialMetric, ROICalculation, AlertRule, Alert, SavedReport, ReportDelivery
-    from app.models.strategy import TopicCluster, RegionalData, ChurnPrediction, FrictionCost, StrategicRecommendation
-    from app.models.analytics import RCAMetric, SentimentMetric, VolumeForecast, AgentPerformance
+    from app.core.migrations import check_schema, migrate
     
-    async with engine.begin() as conn:
-        # Create all tables
-        await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database tables created successfully")
+    schema = await check_schema(engine)
+    if schema["pending"] and settings.AUTO_MIGRATE:
+        applied = await migrate(engine)
+        logger.info(f"Applied migrations: {', '.join(applied) or 'none'}")
+        schema = await check_schema(engine)
+    return schema
+
+
+async def warm_pool(target: AsyncEngine, connections: int):
+    """Open `connections` pooled connections concurrently so first requests don't pay for TLS setup"""
+    async def checkout():
+        async with target.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+    
+    try:
+        await asyncio.gather(*(checkout() for _ in range(connections)))
+    except Exception as e:
+        logger.warning(f"Connection pool warm-up failed: {e}")
 
 
 async def get_db() -> AsyncSession:
@@ -87,3 +177,37 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """
+    Dependency to get a read-only session for reporting queries.
+    
+    Uses the read pool (replica if DATABASE_READ_URL is set), which may lag
+    the primary slightly. Don't use it for endpoints that write.
+    """
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def pool_stats(target: AsyncEngine = None) -> Dict:
+    """Checkout and wait-time stats for an engine's pool (default: primary)"""
+    pool = (target or engine).pool
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+    }
+    if isinstance(pool, TimedQueuePool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "checkout_timeouts": pool.checkout_timeouts,
+            "avg_wait_ms": round(pool.total_wait / pool.checkouts * 1000, 2) if pool.checkouts else 0,
+            "max_wait_ms": round(pool.max_wait * 1000, 2),
+        })
+    return stats
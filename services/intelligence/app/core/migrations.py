@@ -0,0 +1,226 @@
+"""
+Schema versioning.
+
+Migrations are the numbered files in migrations/ (NNN_description.sql).
+Applied versions are recorded in the schema_migrations table, so process
+startup only has to compare the newest recorded version with the newest
+file, which is one cheap query instead of running DDL on every boot.
+
+DDL runs only through the explicit command:
+
+    python -m app.migrate
+
+It creates any model tables that don't exist yet (what init_db used to
+do on every start), then applies pending migration files in order. Some
+migrations rewrite tables or build indexes CONCURRENTLY, so run it in a
+maintenance window, not in the build (see DEPLOY_GUIDE.md).
+
+A database that has tables but no schema_migrations table predates
+versioning; migrate refuses to touch it until the versions already applied
+by hand are recorded with `--baseline VERSION`.
+
+A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind, which
+IF NOT EXISTS then skips on a rerun. A migration's version is only
+recorded once every index it creates is valid.
+"""
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+SCHEMA_TABLE = "schema_migrations"
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+CREATE_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(\w+)",
+    re.IGNORECASE
+)
+
+# Indexes (by name) that exist but are not valid
+INVALID_INDEXES_SQL = """
+SELECT name FROM unnest($1::text[]) AS name
+JOIN pg_index ON pg_index.indexrelid = to_regclass(name)
+WHERE NOT pg_index.indisvalid
+"""
+
+CREATE_SCHEMA_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} (
+    version VARCHAR(32) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT NOW()
+)
+"""
+
+
+class Migration(NamedTuple):
+    version: str
+    name: str
+    path: Path
+
+
+def discover_migrations() -> List[Migration]:
+    """Migration files, oldest first"""
+    migrations = []
+    for path in MIGRATIONS_DIR.glob("*.sql"):
+        match = MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append(Migration(match.group(1), match.group(2), path))
+    return sorted(migrations, key=lambda migration: int(migration.version))
+
+
+def latest_version() -> Optional[str]:
+    migrations = discover_migrations()
+    return migrations[-1].version if migrations else None
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a migration file into statements.
+
+    Statements run one at a time, so files can mix transaction blocks with
+    CREATE INDEX CONCURRENTLY. Only handles `--` comments and `;` at the end
+    of a line, which is all the migrations in this repo use.
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    statements = []
+    current = []
+    for line in lines:
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            statement = "\n".join(current).strip().rstrip(";").strip()
+            if statement:
+                statements.append(statement)
+            current = []
+    tail = "\n".join(current).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+
+def created_indexes(sql: str) -> List[str]:
+    """Names of the indexes a migration file creates"""
+    return [match.group(1) for match in CREATE_INDEX.finditer(sql)]
+
+
+async def applied_versions(engine: AsyncEngine) -> Optional[List[str]]:
+    """Versions recorded in schema_migrations, or None if the table doesn't exist"""
+    async with engine.connect() as conn:
+        exists = await conn.exec_driver_sql(f"SELECT to_regclass('{SCHEMA_TABLE}')")
+        if exists.scalar() is None:
+            return None
+        result = await conn.exec_driver_sql(f"SELECT version FROM {SCHEMA_TABLE}")
+        return [row[0] for row in result]
+
+
+async def check_schema(engine: AsyncEngine) -> Dict:
+    """
+    Compare the database's schema version with the migration files.
+
+    Runs no DDL. Returns the current and expected versions and the list of
+    pending migrations (empty when the schema is current).
+    """
+    applied = await applied_versions(engine)
+    expected = latest_version()
+    pending = [
+        migration.version for migration in discover_migrations()
+        if applied is None or migration.version not in applied
+    ]
+    current = max(applied, key=int) if applied else None
+
+    if pending:
+        logger.warning(
+            f"Database schema is at version {current or 'none'}, expected {expected}; "
+            f"pending migrations: {', '.join(pending)}. Run `python -m app.migrate`."
+        )
+    return {"current": current, "expected": expected, "pending": pending}
+
+
+async def create_tables(engine: AsyncEngine):
+    """Create model tables that don't exist yet"""
+    # Import all models so Base.metadata knows about them
+    from app.models.database import Base
+    from app.models.tenant import Tenant, User, APIKey, Integration
+    from app.models.ticket import Ticket, TicketComment
+    from app.models.executive import FinancialMetric, ROICalculation, AlertRule, Alert, SavedReport, ReportDelivery
+    from app.models.strategy import TopicCluster, RegionalData, ChurnPrediction, FrictionCost, StrategicRecommendation
+    from app.models.analytics import RCAMetric, SentimentMetric, VolumeForecast, AgentPerformance
+
+    async with engine.begin() as conn:
+        # The ticket search indexes use operator classes from these
+        for extension in ("pg_trgm", "btree_gin"):
+            await conn.exec_driver_sql(f"CREATE EXTENSION IF NOT EXISTS {extension}")
+        await conn.run_sync(Base.metadata.create_all)
+    logger.info("Database tables created")
+
+
+async def migrate(engine: AsyncEngine, baseline: Optional[str] = None) -> List[str]:
+    """
+    Create missing tables, then apply pending migrations in order.
+
+    Args:
+        engine: Engine to run against
+        baseline: Record migrations up to and including this version as
+            applied without running them, and apply nothing else ("latest"
+            for all of them). For databases built from
+            init_fresh_database.sql or migrated by hand before versioning
+            existed.
+
+    Returns:
+        Versions applied (or recorded)
+
+    Raises:
+        RuntimeError: If the database predates versioning and no baseline
+            is given, or a migration left an invalid index (its version is
+            not recorded)
+    """
+    autocommit = engine.execution_options(isolation_level="AUTOCOMMIT")
+    if baseline is None:
+        async with engine.connect() as conn:
+            versioned = (await conn.exec_driver_sql(f"SELECT to_regclass('{SCHEMA_TABLE}')")).scalar()
+            existing = (await conn.exec_driver_sql("SELECT to_regclass('tickets')")).scalar()
+        if versioned is None and existing is not None:
+            raise RuntimeError(
+                f"Database has tables but no {SCHEMA_TABLE}; record the migrations already applied "
+                f"with `python -m app.migrate --baseline VERSION` first"
+            )
+
+    async with autocommit.connect() as conn:
+        await conn.exec_driver_sql(CREATE_SCHEMA_TABLE_SQL)
+
+    if baseline is None:
+        await create_tables(engine)
+
+    applied = set(await applied_versions(engine) or [])
+    done = []
+    for migration in discover_migrations():
+        if migration.version in applied:
+            continue
+        if baseline is not None and baseline != "latest" and int(migration.version) > int(baseline):
+            break
+
+        async with autocommit.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            if baseline is None:
+                logger.info(f"Applying migration {migration.path.name}")
+                sql = migration.path.read_text()
+                for statement in split_statements(sql):
+                    await driver.execute(statement)
+
+                invalid = [row[0] for row in await driver.fetch(INVALID_INDEXES_SQL, created_indexes(sql))]
+                if invalid:
+                    raise RuntimeError(
+                        f"Migration {migration.path.name} left invalid indexes: {', '.join(invalid)}. "
+                        f"Drop them with DROP INDEX CONCURRENTLY and run the migration again."
+                    )
+            await driver.execute(
+                f"INSERT INTO {SCHEMA_TABLE} (version, name) VALUES ($1, $2) ON CONFLICT (version) DO NOTHING",
+                migration.version, migration.name
+            )
+        done.append(migration.version)
+
+    return done
@@ -0,0 +1,94 @@
+"""
+Password hashing off the event loop.
+
+bcrypt costs ~100-300 ms of CPU per hash or verify. Run inline, a burst of
+logins stalls every other request on the worker. Here the work goes to a
+dedicated thread pool (bcrypt releases the GIL while hashing, so threads
+run in parallel). A semaphore caps concurrent operations, so excess calls
+wait in line and a login spike can't take over every core. The number of
+waiting calls is exposed in stats() as the queue depth.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@lru_cache()
+def get_pwd_context():
+    """bcrypt CryptContext, built on first use to keep passlib out of startup"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool"""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure_pool(self):
+        # Created lazily so the semaphore binds to the running loop
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hash"
+            )
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+    async def _run(self, func, *args):
+        self._ensure_pool()
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.total_wait += time.perf_counter() - queued_at
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_pwd_context().hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(get_pwd_context().verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._semaphore = None
+
+    def stats(self) -> Dict:
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 2) if self.completed else 0,
+        }
+
+
+password_hasher = PasswordHasher(max_workers=settings.PASSWORD_HASH_WORKERS)
@@ -0,0 +1,172 @@
+"""
+Cache-aside principal cache for authentication.
+
+get_current_user and get_current_tenant run on every authenticated request,
+and API key auth on every integration call. This keeps the user, tenant and
+API key rows they load in an in-process LRU (short TTL) in front of Redis
+(longer TTL), so the hot path does no DB queries.
+
+Cached rows are rebuilt as detached instances and merged into the request's
+session without a load. Handlers can still modify them and commit as usual.
+Writes that change users, tenants or API keys must call invalidate_user /
+invalidate_tenant / invalidate_api_key. Other processes' local copies expire within the local TTL.
+"""
+from datetime import datetime, date
+import json
+import logging
+import uuid
+from typing import Any, Dict, Optional, Type
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, Date, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import LocalCache
+from app.core.config import get_settings
+from app.core.redis import redis_client
+from app.models.tenant import User, Tenant, APIKey
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+KEY_PREFIX = "principal"
+
+# Never cached. The model defers it with raiseload, so reading it off a cached
+# principal raises; login queries it with undefer()
+EXCLUDED_COLUMNS = {"password_hash"}
+
+_local = LocalCache(settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS, max_entries=10_000)
+
+
+def principal_key(kind: str, entity_id: Any) -> str:
+    return f"{KEY_PREFIX}:{kind}:{entity_id}"
+
+
+def to_row(instance) -> Dict[str, Any]:
+    """Column values of a loaded instance"""
+    return {
+        column.key: getattr(instance, column.key)
+        for column in instance.__table__.columns
+        if column.key not in EXCLUDED_COLUMNS
+    }
+
+
+def from_json(model: Type, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore Python types for a row decoded from JSON"""
+    row = {}
+    for column in model.__table__.columns:
+        if column.key not in data:
+            continue
+        value = data[column.key]
+        if value is not None:
+            if isinstance(column.type, UUID):
+                value = uuid.UUID(value)
+            elif isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, Date):
+                value = date.fromisoformat(value)
+        row[column.key] = value
+    return row
+
+
+async def attach(db: AsyncSession, model: Type, row: Dict[str, Any]):
+    """Merge a cached row into the session as a persistent instance, without a query"""
+    instance = model(**row)
+    make_transient_to_detached(instance)
+    return await db.merge(instance, load=False)
+
+
+async def get_cached(db: AsyncSession, model: Type, kind: str, entity_id: Any, query):
+    """
+    Load a principal row through the cache.
+
+    Args:
+        db: Request session the instance is attached to
+        model: Mapped class (User or Tenant)
+        kind: Key namespace ('user' or 'tenant')
+        entity_id: Primary key
+        query: SELECT to run on a miss
+
+    Returns:
+        The instance, or None if the row doesn't exist
+    """
+    key = principal_key(kind, entity_id)
+
+    row = _local.get(key)
+    if row is not None:
+        return await attach(db, model, row)
+
+    try:
+        client = await redis_client.get_client()
+        cached = await client.get(key)
+        if cached:
+            row = from_json(model, json.loads(cached))
+            _local.set(key, row)
+            return await attach(db, model, row)
+    except Exception as e:
+        logger.warning(f"Principal cache read error: {e}")
+
+    result = await db.execute(query)
+    instance = result.scalar_one_or_none()
+    if instance is None:
+        return None
+
+    row = to_row(instance)
+    _local.set(key, row)
+    try:
+        client = await redis_client.get_client()
+        await client.setex(key, settings.PRINCIPAL_CACHE_TTL_SECONDS, json.dumps(jsonable_encoder(row)))
+    except Exception as e:
+        logger.warning(f"Principal cache write error: {e}")
+
+    return instance
+
+
+async def get_user(db: AsyncSession, user_id: str, tenant_id: str) -> Optional[User]:
+    """User by ID, scoped to the tenant in the token"""
+    user = await get_cached(
+        db, User, "user", user_id,
+        select(User).where(User.id == user_id, User.tenant_id == tenant_id)
+    )
+    if user is None or str(user.tenant_id) != str(tenant_id):
+        return None
+    return user
+
+
+async def get_tenant(db: AsyncSession, tenant_id: Any) -> Optional[Tenant]:
+    return await get_cached(
+        db, Tenant, "tenant", tenant_id,
+        select(Tenant).where(Tenant.id == tenant_id)
+    )
+
+
+async def get_api_key(db: AsyncSession, prefix: str) -> Optional[APIKey]:
+    """API key by its public prefix"""
+    return await get_cached(
+        db, APIKey, "api_key", prefix,
+        select(APIKey).where(APIKey.prefix == prefix)
+    )
+
+
+async def invalidate(kind: str, entity_id: Any):
+    key = principal_key(kind, entity_id)
+    _local.delete(key)
+    try:
+        client = await redis_client.get_client()
+        await client.delete(key)
+    except Exception as e:
+        logger.warning(f"Principal cache invalidation error for {key}: {e}")
+
+
+async def invalidate_user(user_id: Any):
+    await invalidate("user", user_id)
+
+
+async def invalidate_tenant(tenant_id: Any):
+    await invalidate("tenant", tenant_id)
+
+
+async def invalidate_api_key(prefix: str):
+    await invalidate("api_key", prefix)
@@ -1,3 +1,8 @@
+import time
+
+# Startup metric: measured from when this module starts importing
+PROCESS_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -8,25 +13,72 @@ from app.core.config import get_settings
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Filled in once the lifespan finishes starting up; shown on /debug
+startup_stats = {}
+
+
+async def warm_redis():
+    from app.core.redis import redis_client
+    try:
+        await redis_client.get_client()
+    except Exception as e:
+        logger.warning(f"Redis warm-up failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Intelligence Service starting up...")
+    lifespan_started = time.perf_counter()
     
-    # Initialize Database
-    from app.core.database import init_db
-    await init_db()
-    
-    # Start Redis Consumer in background
+    # Schema version check and connection warm-up run concurrently
     import asyncio
+    from app.core.database import init_db, warm_pool, engine, read_engine
+    schema, *_ = await asyncio.gather(
+        init_db(),
+        warm_pool(engine, settings.DB_POOL_WARM_CONNECTIONS),
+        warm_pool(read_engine, settings.DB_POOL_WARM_CONNECTIONS),
+        warm_redis()
+    )
+    
+    # Start Redis Consumer in background, unless a standalone worker runs them
     from app.consumers.redis_consumer import redis_consumer
+    from app.consumers.analysis_consumer import analysis_consumer
     
-    task = asyncio.create_task(redis_consumer.start())
+    consumers = [redis_consumer, analysis_consumer] if settings.API_RUN_CONSUMERS else []
+    tasks = [asyncio.create_task(consumer.start()) for consumer in consumers]
+    if not consumers:
+        logger.info("API-only mode: consumers run in app.worker")
+    
+    ready = time.perf_counter()
+    startup_stats.update({
+        "import_ms": round((lifespan_started - PROCESS_STARTED) * 1000, 1),
+        "init_ms": round((ready - lifespan_started) * 1000, 1),
+        "total_ms": round((ready - PROCESS_STARTED) * 1000, 1),
+        "schema": schema,
+    })
+    logger.info(
+        f"Startup completed in {startup_stats['total_ms']} ms "
+        f"(imports {startup_stats['import_ms']} ms, init {startup_stats['init_ms']} ms)"
+    )
     
     yield
     
     logger.info("Intelligence Service shutting down...")
-    await redis_consumer.stop()
-    await task
+    for consumer in consumers:
+        await consumer.stop()
+    await asyncio.gather(*tasks)
+    
+    from app.services.analysis_writer import analysis_writer
+    await analysis_writer.flush()
+    
+    from app.services.llm_gateway import llm_gateway
+    await llm_gateway.close()
+    
+    from app.core.passwords import password_hasher
+    password_hasher.shutdown()
+    
+    from app.core.api_keys import last_used_recorder
+    await last_used_recorder.flush()
 
 app = FastAPI(
     title="Aivora Intelligence Service",
@@ -50,6 +102,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],  # Ticket list pagination
 )
 
 # Add Tenant Context Middleware
@@ -76,6 +129,16 @@ app.include_router(admin.router, tags=["Admin"])
 async def health_check():
     return {"status": "ok", "service": "intelligence", "version": "1.0.0"}
 
+@app.get("/health/workers")
+async def worker_health():
+    """Standalone analysis workers that heartbeated recently"""
+    from app.worker import live_workers
+    try:
+        workers = await live_workers()
+    except Exception as e:
+        return {"status": "unknown", "error": str(e), "workers": []}
+    return {"status": "ok" if workers else "no_workers", "workers": workers}
+
 # Debug Endpoint
 @app.get("/debug")
 async def debug_status():
@@ -92,12 +155,31 @@ async def debug_status():
     except Exception as e:
         redis_status = f"error: {str(e)}"
     
+    from app.services.llm_gateway import llm_gateway
+    from app.services.analysis_cache import analysis_cache
+    from app.consumers.redis_consumer import redis_consumer
+    from app.consumers.analysis_consumer import analysis_consumer
+    from app.services.analysis_writer import analysis_writer
+    from app.core.passwords import password_hasher
+    from app.core.api_keys import last_used_recorder
+    from app.core.database import pool_stats, read_engine
+    
     return {
         "status": "debug",
+        "startup": startup_stats,
         "redis": redis_status,
+        "llm_gateway": llm_gateway.stats(),
+        "analysis_cache": await analysis_cache.stats(),
+        "consumers": [redis_consumer.stats(), analysis_consumer.stats()],
+        "analysis_writer": analysis_writer.stats(),
+        "password_hasher": password_hasher.stats(),
+        "api_key_last_used": last_used_recorder.stats(),
+        "database_pool": pool_stats(),
+        "database_read_pool": pool_stats(read_engine),
         "env_vars": {
             "has_redis_url": bool(settings.REDIS_URL),
             "has_db_url": bool(settings.DATABASE_URL),
+            "has_read_db_url": bool(settings.DATABASE_READ_URL),
             "has_groq_key": bool(settings.GROQ_API_KEY)
         }
     }
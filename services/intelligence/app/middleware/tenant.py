@@ -1,49 +1,72 @@
 """
 Tenant context middleware for request isolation
 """
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Optional
 import jwt
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.core.auth import SECRET_KEY, ALGORITHM
 
+# Endpoints that never carry tenant context
+PUBLIC_PATHS = (
+    "/api/auth/login",
+    "/api/auth/signup",
+    "/health",
+    "/debug",
+    "/docs",
+    "/redoc",
+    "/openapi.json"
+)
 
-class TenantContextMiddleware(BaseHTTPMiddleware):
+
+def bearer_token(scope: Scope) -> Optional[str]:
+    """
+    Raw bearer token from the Authorization header, if any.
+
+    Parsed like FastAPI's HTTPBearer (case-insensitive scheme), so the
+    claims stored here are for the same token the auth dependencies see.
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token
+            return None
+    return None
+
+
+class TenantContextMiddleware:
     """
     Middleware to extract and set tenant context from JWT token
+
+    Pure ASGI, so it adds no per-request task or body wrapping and leaves
+    streaming responses alone. The token is decoded once here; the claims
+    go on request.state and get_current_user reuses them:
+
+    - token_claims: decoded payload, or None if missing/invalid
+    - tenant_id, user_id, user_role: from the claims
     """
-    async def dispatch(self, request: Request, call_next):
-        # Skip auth for public endpoints
-        public_paths = [
-            "/api/auth/login",
-            "/api/auth/signup",
-            "/health",
-            "/debug",
-            "/docs",
-            "/redoc",
-            "/openapi.json"
-        ]
-        
-        if any(request.url.path.startswith(path) for path in public_paths):
-            return await call_next(request)
-        
-        # Extract token from Authorization header
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            # Allow request to proceed - auth will be handled by dependencies
-            return await call_next(request)
-        
-        try:
-            token = auth_header.split(" ")[1]
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            
-            # Set tenant context in request state
-            request.state.tenant_id = payload.get("tenant_id")
-            request.state.user_id = payload.get("sub")
-            request.state.user_role = payload.get("role")
-            
-        except jwt.InvalidTokenError:
-            # Invalid token - let auth dependencies handle it
-            pass
-        
-        response = await call_next(request)
-        return response
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(PUBLIC_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        claims = None
+        token = bearer_token(scope)
+        if token:
+            try:
+                claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            except jwt.InvalidTokenError:
+                # Invalid token - let auth dependencies reject it
+                claims = None
+
+        state["token_claims"] = claims
+        if claims:
+            state["tenant_id"] = claims.get("tenant_id")
+            state["user_id"] = claims.get("sub")
+            state["user_role"] = claims.get("role")
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,58 @@
+"""
+Apply database migrations.
+
+    python -m app.migrate                  # create missing tables, apply pending migrations
+    python -m app.migrate --check          # report the schema version, change nothing
+    python -m app.migrate --baseline 003   # mark 003 and earlier applied without running them
+    python -m app.migrate --baseline       # mark all migrations applied without running them
+
+Run it from a shell in a maintenance window before starting new code, not
+in the build: some migrations rewrite tables or build indexes CONCURRENTLY
+(see DEPLOY_GUIDE.md). API and worker processes only check the version at
+startup.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("app.migrate")
+
+
+async def run(check: bool, baseline: Optional[str]) -> int:
+    from app.core.database import create_engine
+    from app.core.migrations import check_schema, migrate
+
+    engine = create_engine(pool_size=1, max_overflow=0)
+    try:
+        if not check:
+            applied = await migrate(engine, baseline=baseline)
+            verb = "Recorded" if baseline is not None else "Applied"
+            logger.info(f"{verb} migrations: {', '.join(applied) or 'none'}")
+        schema = await check_schema(engine)
+    finally:
+        await engine.dispose()
+
+    logger.info(f"Schema version {schema['current'] or 'none'} (latest {schema['expected']})")
+    return 1 if schema["pending"] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--check", action="store_true", help="Only report pending migrations (exit 1 if any)")
+    group.add_argument(
+        "--baseline",
+        nargs="?",
+        const="latest",
+        metavar="VERSION",
+        help="Record migrations up to VERSION (default: all) as applied without running them"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.check, args.baseline)))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Tenant and User models for multi-tenancy support
 """
 from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Integer
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 
@@ -36,7 +36,9 @@ class User(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False, index=True)
     email = Column(String(255), nullable=False)
-    password_hash = Column(String(255), nullable=False)
+    # Only login reads it (with undefer); principal_cache never caches it, so
+    # reading it off any other instance raises instead of lazy-loading
+    password_hash = deferred(Column(String(255), nullable=False), raiseload=True)
     full_name = Column(String(255))
     role = Column(String(50), nullable=False)  # 'admin', 'manager', 'agent'
     permissions = Column(JSONB, default=[])
@@ -61,6 +63,8 @@ class APIKey(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False, index=True)
     name = Column(String(255), nullable=False)
+    # Public part of the key, used to find the row; the secret is only stored as an HMAC
+    prefix = Column(String(16), unique=True, index=True)
     key_hash = Column(String(255), nullable=False)
     permissions = Column(JSONB, default=[])
     expires_at = Column(DateTime)
@@ -1,9 +1,9 @@
 """
 Ticket and related models for ticket management system
 """
-from sqlalchemy import Column, String, Text, Float, Boolean, DateTime, ForeignKey, Integer
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, Float, Boolean, DateTime, ForeignKey, Integer, Index, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 import uuid
 
@@ -15,7 +15,8 @@ class Ticket(Base):
     __tablename__ = "tickets"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    tenant_id = Column(UUID(as_uuid=True), ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False, index=True)
+    # Indexed through the composite indexes below (tenant_id leads each one)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False)
     
     # Source Information
     external_id = Column(String(255))
@@ -24,6 +25,8 @@ class Ticket(Base):
     # Basic Fields
     title = Column(String(500), nullable=False)
     description = Column(Text)
+    # Fingerprint of title + description; analysis reruns only when it changes
+    content_hash = Column(String(32), Computed("md5(title || E'\\n' || COALESCE(description, ''))", persisted=True))
     status = Column(String(50), default='open')  # 'open', 'pending', 'resolved', 'closed'
     priority = Column(String(20))  # 'low', 'medium', 'high', 'urgent'
     
@@ -44,11 +47,22 @@ class Ticket(Base):
     ai_priority = Column(String(20))  # AI-suggested priority
     ai_suggested_actions = Column(JSONB)  # [{"action": "refund", "confidence": 0.95}]
     ai_category = Column(String(100))  # 'billing', 'technical', 'account', etc.
+    ai_status = Column(String(20), default='pending')  # 'pending', 'completed', 'failed'; NULL predates async analysis
+    ai_analyzed_at = Column(DateTime)
     
     # Metadata
     tags = Column(JSONB, default=[])
     ticket_metadata = Column("metadata", JSONB, default={})  # Use column name override to avoid reserved word
     
+    # Full-text search document (migrations/009_ticket_search.sql); deferred so
+    # ticket loads don't fetch it
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', COALESCE(title, '')), 'A') || "
+        "setweight(to_tsvector('english', COALESCE(ai_summary, '')), 'B') || "
+        "setweight(to_tsvector('english', COALESCE(description, '')), 'C')",
+        persisted=True
+    )))
+    
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -61,6 +75,22 @@ class Ticket(Base):
     tenant = relationship("Tenant")
     assigned_user = relationship("User", foreign_keys=[assigned_to])
     comments = relationship("TicketComment", back_populates="ticket", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Conflict target for webhook upserts (see services/ticket_ingest.py)
+        Index('uq_tickets_tenant_source_external', 'tenant_id', 'source', 'external_id', unique=True),
+        # Tenant-scoped listing and stats (migrations/008_ticket_composite_indexes.sql)
+        Index('idx_tickets_tenant_created', tenant_id, created_at.desc()),
+        Index('idx_tickets_tenant_status_priority', 'tenant_id', 'status', 'priority'),
+        Index('idx_tickets_tenant_category', 'tenant_id', 'ai_category'),
+        Index('idx_tickets_open_sla', 'sla_due_at', postgresql_where=text("status IN ('open', 'in_progress')")),
+        # Search (migrations/009_ticket_search.sql; needs btree_gin and pg_trgm)
+        Index('idx_tickets_tenant_search', 'tenant_id', 'search_vector', postgresql_using='gin'),
+        Index('idx_tickets_tenant_title_trgm', 'tenant_id', 'title',
+              postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('idx_tickets_tenant_description_trgm', 'tenant_id', 'description',
+              postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}),
+    )
 
 
 class TicketComment(Base):
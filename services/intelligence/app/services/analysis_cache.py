@@ -0,0 +1,151 @@
+"""
+Content-addressed cache for LLM ticket analyses.
+
+Duplicate tickets (the same outage, the same "where is my order" template)
+map to the same key, so only the first one costs an LLM call. Keys hash the
+normalized title + description together with the model name and prompt
+version; changing either naturally misses the old entries.
+
+Entries live in Redis with a TTL. A sorted set of last-access times bounds
+the number of entries and evicts the least recently used ones. Members whose
+keys expired through the TTL are dropped from the set when a read misses
+them, and by age before the set is counted, so they don't take up capacity.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+KEY_PREFIX = "analysis"
+LRU_KEY = f"{KEY_PREFIX}:lru"
+HITS_KEY = f"{KEY_PREFIX}:stats:hits"
+MISSES_KEY = f"{KEY_PREFIX}:stats:misses"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form of ticket text"""
+    return _WHITESPACE.sub(" ", (text or "").casefold()).strip()
+
+
+def content_key(title: str, description: Optional[str], model: str, prompt_version: str) -> str:
+    """Cache key for a ticket's content under a given model and prompt"""
+    content = f"{normalize_text(title)}\n{normalize_text(description)}"
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    return f"{KEY_PREFIX}:{prompt_version}:{model}:{digest}"
+
+
+class AnalysisCache:
+    """Redis-backed LRU cache of serialized ticket analyses"""
+
+    def __init__(self, max_entries: int = 10_000, ttl: int = 7 * 24 * 3600, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, title: str, description: Optional[str], model: str, prompt_version: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+
+        key = content_key(title, description, model, prompt_version)
+        try:
+            client = await redis_client.get_client()
+            cached = await client.get(key)
+
+            pipe = client.pipeline(transaction=False)
+            if cached:
+                pipe.zadd(LRU_KEY, {key: time.time()})
+                pipe.incr(HITS_KEY)
+            else:
+                pipe.zrem(LRU_KEY, key)
+                pipe.incr(MISSES_KEY)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Analysis cache read error: {e}")
+            return None
+
+        if not cached:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(cached)
+
+    async def set(self, title: str, description: Optional[str], model: str, prompt_version: str, analysis: Dict):
+        if not self.enabled:
+            return
+
+        key = content_key(title, description, model, prompt_version)
+        try:
+            client = await redis_client.get_client()
+            pipe = client.pipeline(transaction=False)
+            now = time.time()
+            pipe.setex(key, self.ttl, json.dumps(analysis))
+            pipe.zadd(LRU_KEY, {key: now})
+            self._drop_expired(pipe, now)
+            pipe.zcard(LRU_KEY)
+            *_, size = await pipe.execute()
+
+            if size > self.max_entries:
+                await self._evict(client, size - self.max_entries)
+        except Exception as e:
+            logger.warning(f"Analysis cache write error: {e}")
+
+    def _drop_expired(self, pipe, now: float):
+        """
+        Queue removal of members last accessed more than a TTL ago.
+
+        A hit doesn't extend the TTL, so their keys have expired for sure.
+        """
+        pipe.zremrangebyscore(LRU_KEY, "-inf", now - self.ttl)
+
+    async def _evict(self, client, count: int):
+        """Drop the least recently used entries"""
+        evicted = await client.zpopmin(LRU_KEY, count)
+        keys = [member for member, _score in evicted]
+        if keys:
+            await client.delete(*keys)
+            logger.info(f"Evicted {len(keys)} analysis cache entries")
+
+    async def stats(self) -> Dict:
+        """Hit/miss counters for this process and across all workers"""
+        result = {
+            "enabled": self.enabled,
+            "process_hits": self.hits,
+            "process_misses": self.misses,
+        }
+        try:
+            client = await redis_client.get_client()
+            pipe = client.pipeline(transaction=False)
+            pipe.get(HITS_KEY)
+            pipe.get(MISSES_KEY)
+            self._drop_expired(pipe, time.time())
+            pipe.zcard(LRU_KEY)
+            hits, misses, _, size = await pipe.execute()
+            result.update({
+                "hits": int(hits or 0),
+                "misses": int(misses or 0),
+                "entries": size,
+                "max_entries": self.max_entries,
+            })
+        except Exception as e:
+            logger.warning(f"Analysis cache stats error: {e}")
+        return result
+
+
+analysis_cache = AnalysisCache(
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    enabled=settings.ANALYSIS_CACHE_ENABLED
+)
@@ -0,0 +1,112 @@
+"""
+Durable queue for ticket analysis jobs, backed by a Redis Stream.
+
+Webhooks persist the ticket and append a job here so they can answer
+with 202 right away; the analysis consumer runs the LLM out of band.
+
+The stream is not capped with MAXLEN, which would trim jobs before they
+are read; consumers trim acknowledged entries instead. A job can still go
+missing (XADD failed after the ticket was committed), so the analysis
+consumer periodically re-enqueues tickets left pending with
+requeue_lost_jobs.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Union
+import uuid
+
+from sqlalchemy import text
+
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_STREAM = "tickets:analysis"
+ANALYSIS_GROUP = "analysis-workers"
+
+# Pending tickets older than the oldest unfinished job are re-enqueued in
+# batches of this size. Re-enqueueing sets updated_at, so the next sweep
+# skips them until their new job is done.
+REQUEUE_BATCH_SIZE = 500
+REQUEUE_PENDING_SQL = text("""
+    UPDATE tickets
+    SET updated_at = NOW()
+    WHERE id IN (
+        SELECT id FROM tickets
+        WHERE ai_status = 'pending'
+          AND COALESCE(updated_at, created_at) < :before
+        ORDER BY COALESCE(updated_at, created_at)
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, tenant_id
+""")
+
+
+async def enqueue_analysis(ticket_id: Union[str, uuid.UUID], tenant_id: Union[str, uuid.UUID]) -> str:
+    """
+    Append an analysis job for a persisted ticket.
+
+    Returns:
+        The Redis Stream entry ID of the job
+    """
+    client = await redis_client.get_client()
+    entry_id = await client.xadd(
+        ANALYSIS_STREAM,
+        {"ticket_id": str(ticket_id), "tenant_id": str(tenant_id)}
+    )
+    logger.debug(f"Enqueued analysis for ticket {ticket_id} ({entry_id})")
+    return entry_id
+
+
+async def enqueue_analysis_bulk(ticket_ids: Iterable[Union[str, uuid.UUID]], tenant_id: Union[str, uuid.UUID]) -> int:
+    """
+    Append analysis jobs for many tickets in a single round trip.
+
+    Returns:
+        Number of jobs enqueued
+    """
+    client = await redis_client.get_client()
+    pipe = client.pipeline(transaction=False)
+    count = 0
+    for ticket_id in ticket_ids:
+        pipe.xadd(
+            ANALYSIS_STREAM,
+            {"ticket_id": str(ticket_id), "tenant_id": str(tenant_id)}
+        )
+        count += 1
+    if count:
+        await pipe.execute()
+    return count
+
+
+async def requeue_lost_jobs(before: datetime, limit: int = REQUEUE_BATCH_SIZE) -> int:
+    """
+    Re-enqueue tickets still pending analysis that were last written before
+    `before`.
+
+    Callers pass the time of the oldest job not yet acknowledged (minus a
+    grace period): every job enqueued earlier has been handled, so a ticket
+    still pending from then lost its job.
+
+    Returns:
+        Number of jobs enqueued
+    """
+    from app.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(REQUEUE_PENDING_SQL, {"before": before, "limit": limit})
+        rows = result.all()
+        await session.commit()
+
+    by_tenant = defaultdict(list)
+    for row in rows:
+        by_tenant[row.tenant_id].append(row.id)
+
+    requeued = 0
+    for tenant_id, ticket_ids in by_tenant.items():
+        requeued += await enqueue_analysis_bulk(ticket_ids, tenant_id)
+    if requeued:
+        logger.warning(f"Re-enqueued analysis for {requeued} tickets left pending")
+    return requeued
@@ -0,0 +1,143 @@
+"""
+Micro-batched writes of analysis results.
+
+The consumers finish analyses one ticket at a time, and committing each
+one separately makes a transaction per ticket. Writes submitted here are
+buffered for up to `max_items` items or `max_delay_ms` milliseconds. Each
+buffer is flushed in one transaction, with one executemany per distinct
+statement.
+
+If the batch fails, its items are retried one by one under savepoints, so
+a bad row only fails its own submitter. Every submitter's wait ends: if
+the flush itself breaks (no connection, failed rollback), the error is
+raised to all of them.
+
+Stream consumers give their concurrency slot back before submitting (see
+stream_consumer.release_slot), so a batch can collect more writes than
+there are slots.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class AnalysisWriteBatcher:
+    """Coalesces single-row analysis updates into batched transactions"""
+
+    def __init__(self, max_items: int = 100, max_delay_ms: int = 50):
+        self.max_items = max_items
+        self.max_delay_ms = max_delay_ms
+        self.flushes = 0
+        self.items_written = 0
+        self.items_failed = 0
+        self._pending: List[Tuple[object, Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+
+    async def submit(self, statement, params: Dict):
+        """
+        Queue one write and wait until its batch is committed.
+
+        Raises:
+            Exception: Whatever the write raised, if this item failed
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((statement, params, future))
+
+        if len(self._pending) >= self.max_items:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+        await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_delay_ms / 1000)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far"""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            await self._write_batch(batch)
+        except Exception as e:
+            logger.error(f"Analysis write flush of {len(batch)} items failed: {e}")
+            for _statement, _params, future in batch:
+                if not future.done():
+                    self.items_failed += 1
+                    future.set_exception(e)
+
+    async def _write_batch(self, batch: List[Tuple[object, Dict, asyncio.Future]]):
+        from app.core.database import AsyncSessionLocal
+
+        # One executemany per statement, preserving submission order within each
+        groups: Dict[object, List[Dict]] = {}
+        for statement, params, _future in batch:
+            groups.setdefault(statement, []).append(params)
+
+        async with AsyncSessionLocal() as session:
+            try:
+                for statement, params_list in groups.items():
+                    await session.execute(statement, params_list)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.warning(f"Batched analysis write of {len(batch)} items failed, retrying one by one: {e}")
+                await self._write_individually(session, batch)
+                return
+
+        self.flushes += 1
+        self.items_written += len(batch)
+        for _statement, _params, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def _write_individually(self, session, batch: List[Tuple[object, Dict, asyncio.Future]]):
+        written = []
+        for statement, params, future in batch:
+            try:
+                async with session.begin_nested():
+                    await session.execute(statement, params)
+                written.append(future)
+            except Exception as e:
+                self.items_failed += 1
+                if not future.done():
+                    future.set_exception(e)
+
+        try:
+            await session.commit()
+        except Exception as e:
+            self.items_failed += len(written)
+            for future in written:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.flushes += 1
+        self.items_written += len(written)
+        for future in written:
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self) -> Dict:
+        return {
+            "flushes": self.flushes,
+            "items_written": self.items_written,
+            "items_failed": self.items_failed,
+            "avg_batch_size": round(self.items_written / self.flushes, 2) if self.flushes else 0,
+            "pending": len(self._pending),
+        }
+
+
+analysis_writer = AnalysisWriteBatcher(
+    max_items=settings.ANALYSIS_WRITE_BATCH_SIZE,
+    max_delay_ms=settings.ANALYSIS_WRITE_MAX_DELAY_MS
+)
@@ -0,0 +1,131 @@
+"""
+Process-wide async gateway to the LLM provider.
+
+Every caller (webhooks, LLMService, the consumers) shares one AsyncGroq
+client and its HTTP connection pool. A semaphore caps the number of
+completions in flight and every call has a hard timeout, so one slow
+completion never blocks the event loop or starves other requests.
+"""
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from app.core.config import get_settings
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class LLMGateway:
+    """Pooled, concurrency-limited access to chat completions"""
+    
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = 8,
+        timeout: float = 30.0,
+        max_connections: int = 20
+    ):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self._client: Optional["AsyncGroq"] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    @property
+    def client(self) -> "AsyncGroq":
+        """Lazily build the shared client on first use"""
+        if self._client is None:
+            # Imported here so process startup doesn't pay for the SDK
+            import httpx
+            from groq import AsyncGroq
+            
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=self.timeout
+            )
+            self._client = AsyncGroq(
+                api_key=self.api_key,
+                http_client=http_client,
+                timeout=self.timeout
+            )
+        return self._client
+    
+    async def complete(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Run a chat completion and return the message content.
+        
+        Args:
+            messages: Chat messages
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            response_format: Provider response format (e.g. JSON mode)
+            timeout: Per-call timeout in seconds (defaults to the gateway timeout)
+        
+        Raises:
+            asyncio.TimeoutError: If the call exceeds its timeout
+        """
+        kwargs = {}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        
+        call_timeout = timeout or self.timeout
+        
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        timeout=call_timeout,
+                        **kwargs
+                    ),
+                    timeout=call_timeout
+                )
+            finally:
+                self.in_flight -= 1
+        
+        return response.choices[0].message.content
+    
+    def stats(self) -> Dict:
+        """Current gateway load"""
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout
+        }
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            logger.info("LLM gateway closed")
+
+
+llm_gateway = LLMGateway(
+    api_key=settings.GROQ_API_KEY,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    timeout=settings.LLM_TIMEOUT_SECONDS,
+    max_connections=settings.LLM_MAX_CONNECTIONS
+)
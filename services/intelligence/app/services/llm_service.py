@@ -1,19 +1,20 @@
 import json
-from groq import AsyncGroq
-from app.core.config import get_settings
+from app.services.llm_gateway import llm_gateway
 import logging
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 class LLMService:
     def __init__(self):
-        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+        self.gateway = llm_gateway
         self.model = "llama3-70b-8192" # Or "mixtral-8x7b-32768"
 
-    async def analyze_ticket(self, ticket_data: dict) -> dict:
+    async def analyze_ticket(self, ticket_data: dict, fallback: bool = True) -> dict:
         """
         Analyzes the ticket content to extract sentiment, intent, urgency, and category.
+
+        With fallback=False a failed call raises instead of returning the
+        placeholder values, so a consumer can retry it.
         """
         subject = ticket_data.get("title", "")
         description = ticket_data.get("description", "")
@@ -35,7 +36,7 @@ class LLMService:
         """
 
         try:
-            chat_completion = await self.client.chat.completions.create(
+            response_content = await self.gateway.complete(
                 messages=[
                     {
                         "role": "system",
@@ -51,11 +52,12 @@ class LLMService:
                 response_format={"type": "json_object"}
             )
 
-            response_content = chat_completion.choices[0].message.content
             return json.loads(response_content)
 
         except Exception as e:
             logger.error(f"Error calling Groq API: {e}")
+            if not fallback:
+                raise
             # Return default/fallback values on error
             return {
                 "sentiment": "Neutral",
@@ -0,0 +1,320 @@
+"""
+Ticket upserts shared by every ingestion path.
+
+All webhook sources write through a single INSERT ... ON CONFLICT DO UPDATE
+keyed on (tenant_id, source, external_id), so a delivery costs one round
+trip and concurrent or repeated deliveries can't create duplicate rows.
+Deliveries that change nothing are not written at all, and only changes to
+the title or description (tracked by tickets.content_hash) send a ticket
+back for AI analysis.
+
+Bulk ingestion streams rows into a temporary staging table with asyncpg's
+binary COPY and merges them with one such statement per batch.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ticket import Ticket
+
+logger = logging.getLogger(__name__)
+
+STAGING_COLUMNS = [
+    "seq",
+    "id",
+    "tenant_id",
+    "external_id",
+    "source",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "customer_email",
+    "customer_name",
+]
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE tickets_staging (
+        seq INTEGER NOT NULL,
+        id UUID NOT NULL,
+        tenant_id UUID NOT NULL,
+        external_id VARCHAR(255),
+        source VARCHAR(50) NOT NULL,
+        title VARCHAR(500),
+        description TEXT,
+        status VARCHAR(50),
+        priority VARCHAR(20),
+        customer_email VARCHAR(255),
+        customer_name VARCHAR(255)
+    ) ON COMMIT DROP
+"""
+
+# Both upserts share the same rules:
+# - the conflict's WHERE skips the write entirely when the event changes
+#   nothing, so status-only churn doesn't bloat the table;
+# - ai_status goes back to pending only when title/description change;
+# - `previous` reads the pre-statement content_hash (CTEs share the
+#   statement's snapshot), so RETURNING can report whether content changed.
+# xmax = 0 tells freshly inserted rows apart from updated ones.
+UPSERT_TICKET_SQL = """
+    WITH previous AS (
+        SELECT content_hash
+        FROM tickets
+        WHERE tenant_id = :tenant_id AND source = :source AND external_id = :external_id
+    )
+    INSERT INTO tickets (
+        id, tenant_id, external_id, source, title, description, status, priority,
+        customer_email, customer_name, ai_status, tags, metadata, created_at, updated_at
+    )
+    VALUES (
+        :id, :tenant_id, :external_id, :source,
+        COALESCE(CAST(:title AS VARCHAR(500)), 'No subject'), COALESCE(CAST(:description AS TEXT), ''),
+        :status, :priority, :customer_email, :customer_name,
+        'pending', '[]'::jsonb, '{}'::jsonb, NOW(), NOW()
+    )
+    ON CONFLICT (tenant_id, source, external_id) DO UPDATE SET
+        title = COALESCE(CAST(:title AS VARCHAR(500)), tickets.title),
+        description = COALESCE(CAST(:description AS TEXT), tickets.description),
+        status = EXCLUDED.status,
+        priority = EXCLUDED.priority,
+        ai_status = CASE
+            WHEN (tickets.title, tickets.description) IS NOT DISTINCT FROM
+                (COALESCE(CAST(:title AS VARCHAR(500)), tickets.title), COALESCE(CAST(:description AS TEXT), tickets.description))
+            THEN tickets.ai_status
+            ELSE 'pending'
+        END,
+        updated_at = NOW()
+    WHERE (tickets.title, tickets.description, tickets.status, tickets.priority) IS DISTINCT FROM (
+        COALESCE(CAST(:title AS VARCHAR(500)), tickets.title),
+        COALESCE(CAST(:description AS TEXT), tickets.description),
+        EXCLUDED.status,
+        EXCLUDED.priority
+    )
+    RETURNING
+        id,
+        (xmax = 0) AS created,
+        content_hash IS DISTINCT FROM (SELECT content_hash FROM previous) AS content_changed
+"""
+
+# ON CONFLICT can touch a row only once per statement, so later lines win
+# when a batch repeats the same external ticket. Lines without a subject or
+# description insert the same defaults as upsert_ticket but keep the stored
+# values on update; EXCLUDED only has the defaults, so `untitled` and
+# `undescribed` record which lines left them out.
+_MERGED_TITLE = "CASE WHEN EXCLUDED.id IN (SELECT id FROM untitled) THEN tickets.title ELSE EXCLUDED.title END"
+_MERGED_DESCRIPTION = (
+    "CASE WHEN EXCLUDED.id IN (SELECT id FROM undescribed) THEN tickets.description ELSE EXCLUDED.description END"
+)
+# content_changed joins the merged rows to `previous` once, rather than
+# looking each returned row up in the CTE
+MERGE_STAGING_SQL = f"""
+    WITH batch AS (
+        SELECT DISTINCT ON (tenant_id, source, COALESCE(external_id, id::text)) *
+        FROM tickets_staging
+        ORDER BY tenant_id, source, COALESCE(external_id, id::text), seq DESC
+    ),
+    untitled AS (
+        SELECT id FROM batch WHERE title IS NULL
+    ),
+    undescribed AS (
+        SELECT id FROM batch WHERE description IS NULL
+    ),
+    previous AS (
+        SELECT t.id, t.content_hash
+        FROM tickets t
+        JOIN batch b
+          ON t.tenant_id = b.tenant_id AND t.source = b.source AND t.external_id = b.external_id
+    ),
+    merged AS (
+        INSERT INTO tickets (
+            id, tenant_id, external_id, source, title, description, status, priority,
+            customer_email, customer_name, ai_status, tags, metadata, created_at, updated_at
+        )
+        SELECT
+            b.id, b.tenant_id, b.external_id, b.source, COALESCE(b.title, 'No subject'), COALESCE(b.description, ''),
+            b.status, b.priority, b.customer_email, b.customer_name, 'pending', '[]'::jsonb, '{{}}'::jsonb, NOW(), NOW()
+        FROM batch b
+        ON CONFLICT (tenant_id, source, external_id) DO UPDATE SET
+            title = {_MERGED_TITLE},
+            description = {_MERGED_DESCRIPTION},
+            status = EXCLUDED.status,
+            priority = EXCLUDED.priority,
+            ai_status = CASE
+                WHEN (tickets.title, tickets.description) IS NOT DISTINCT FROM ({_MERGED_TITLE}, {_MERGED_DESCRIPTION})
+                THEN tickets.ai_status
+                ELSE 'pending'
+            END,
+            updated_at = NOW()
+        WHERE (tickets.title, tickets.description, tickets.status, tickets.priority) IS DISTINCT FROM (
+            {_MERGED_TITLE},
+            {_MERGED_DESCRIPTION},
+            EXCLUDED.status,
+            EXCLUDED.priority
+        )
+        RETURNING id, (xmax = 0) AS inserted, content_hash
+    )
+    SELECT
+        m.id,
+        m.inserted,
+        m.content_hash IS DISTINCT FROM p.content_hash AS content_changed
+    FROM merged m
+    LEFT JOIN previous p USING (id)
+"""
+
+# Staging column limits (the tickets table's). One value that doesn't fit
+# would fail the whole batch's COPY, so each line is checked before staging:
+# display text is truncated, identifiers and enum-like values reject the line.
+TRUNCATED_LENGTHS = {"title": 500, "customer_name": 255}
+MAX_LENGTHS = {"external_id": 255, "source": 50, "status": 50, "priority": 20, "customer_email": 255}
+
+
+@dataclass
+class UpsertResult:
+    """Outcome of upserting one ticket"""
+    ticket_id: uuid.UUID
+    created: bool = False
+    updated: bool = False
+    content_changed: bool = False
+
+    @property
+    def needs_analysis(self) -> bool:
+        """New tickets and tickets whose title/description changed"""
+        return self.created or self.content_changed
+
+
+@dataclass
+class BatchResult:
+    """Outcome of merging one batch"""
+    received: int = 0
+    inserted_ids: List[uuid.UUID] = field(default_factory=list)
+    changed_ids: List[uuid.UUID] = field(default_factory=list)
+    updated: int = 0
+
+    @property
+    def inserted(self) -> int:
+        return len(self.inserted_ids)
+
+    @property
+    def analysis_ids(self) -> List[uuid.UUID]:
+        """Tickets to (re-)analyze: new ones plus updates that changed content"""
+        return self.inserted_ids + self.changed_ids
+
+
+async def upsert_ticket(db: AsyncSession, tenant_id: uuid.UUID, fields: dict) -> UpsertResult:
+    """
+    Insert a webhook ticket, or update the existing row for its external ID.
+
+    Fields the event left out (None title/description) keep their stored
+    values on update. Runs inside the session's transaction; the caller
+    commits.
+    """
+    result = await db.execute(
+        text(UPSERT_TICKET_SQL),
+        {
+            "id": uuid.uuid4(),
+            "tenant_id": tenant_id,
+            "external_id": fields.get("external_id"),
+            "source": fields["source"],
+            "title": fields["title"][:500] if fields.get("title") else None,
+            "description": fields.get("description"),
+            "status": fields.get("status"),
+            "priority": fields.get("priority"),
+            "customer_email": fields.get("customer_email"),
+            "customer_name": fields.get("customer_name"),
+        }
+    )
+    row = result.one_or_none()
+    if row is not None:
+        return UpsertResult(
+            ticket_id=row.id,
+            created=row.created,
+            updated=not row.created,
+            content_changed=row.content_changed
+        )
+
+    # The conflict's WHERE skipped the write: nothing in the event differs
+    ticket_id = (await db.execute(
+        select(Ticket.id).where(
+            Ticket.tenant_id == tenant_id,
+            Ticket.source == fields["source"],
+            Ticket.external_id == fields.get("external_id")
+        )
+    )).scalar_one()
+    return UpsertResult(ticket_id=ticket_id)
+
+
+def _staged_text(fields: dict, name: str) -> Optional[str]:
+    """A field as COPY-able text, truncated or rejected to fit its column"""
+    value = fields.get(name)
+    if value is None or value == "":
+        return None
+    value = value if isinstance(value, str) else str(value)
+    if name in TRUNCATED_LENGTHS:
+        return value[:TRUNCATED_LENGTHS[name]]
+    limit = MAX_LENGTHS.get(name)
+    if limit and len(value) > limit:
+        raise ValueError(f"{name} is longer than {limit} characters")
+    return value
+
+
+def staging_record(seq: int, tenant_id: uuid.UUID, fields: dict) -> tuple:
+    """
+    Build a COPY record from normalized ticket fields.
+
+    Raises:
+        ValueError: If a field can't be stored (the line should be rejected)
+    """
+    if not fields.get("source"):
+        raise ValueError("source is required")
+    return (
+        seq,
+        uuid.uuid4(),
+        tenant_id,
+        _staged_text(fields, "external_id"),
+        _staged_text(fields, "source"),
+        # None keeps the stored title/description; MERGE_STAGING_SQL
+        # defaults them for new tickets
+        _staged_text(fields, "title"),
+        _staged_text(fields, "description"),
+        _staged_text(fields, "status"),
+        _staged_text(fields, "priority"),
+        _staged_text(fields, "customer_email"),
+        _staged_text(fields, "customer_name"),
+    )
+
+
+async def bulk_upsert_tickets(db: AsyncSession, records: Sequence[tuple]) -> BatchResult:
+    """
+    COPY a batch of staging records and merge them into tickets.
+
+    Runs inside the session's current transaction; the caller commits.
+    """
+    if not records:
+        return BatchResult()
+
+    # Going through the session first opens the transaction the staging
+    # table (ON COMMIT DROP) and the raw COPY below both run in
+    await db.execute(text(CREATE_STAGING_SQL))
+
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "tickets_staging",
+        records=records,
+        columns=STAGING_COLUMNS
+    )
+
+    result = await db.execute(text(MERGE_STAGING_SQL))
+    rows = result.all()
+
+    # Unchanged tickets were skipped by the merge and don't appear here
+    return BatchResult(
+        received=len(records),
+        inserted_ids=[row.id for row in rows if row.inserted],
+        changed_ids=[row.id for row in rows if not row.inserted and row.content_changed],
+        updated=sum(1 for row in rows if not row.inserted)
+    )
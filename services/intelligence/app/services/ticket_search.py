@@ -0,0 +1,139 @@
+"""
+Ranked full-text ticket search.
+
+Matches run against tickets.search_vector, a generated tsvector over title,
+ai_summary and description (migrations/009_ticket_search.sql). The GIN index
+on (tenant_id, search_vector) only holds the tenant's postings, so the cost
+of a search follows the number of matches, not the size of the table.
+
+Whole-word search misses partial words and identifiers ("refun", "78945"),
+so queries of MIN_SUBSTRING_LENGTH or more characters also match substrings
+of title and description through the pg_trgm indexes.
+
+Results are ranked by ts_rank_cd (title hits weigh most), with trigram
+similarity to the title as a smaller term so substring-only hits are ordered
+too. Pages follow a (rank, id) cursor. Highlighted snippets are built with
+ts_headline for the returned page only.
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Float, cast, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import after_rank_cursor, encode_rank_cursor
+from app.models.ticket import Ticket
+
+SEARCH_CONFIG = "english"
+# Inline constant (matches the generated column's config)
+_CONFIG = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+MIN_SUBSTRING_LENGTH = 3
+SIMILARITY_WEIGHT = 0.1
+
+# Snippet markup; ticket text is not HTML-escaped, so clients should escape
+# everything except these markers
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+TITLE_HEADLINE_OPTIONS = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true"
+SNIPPET_HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    "MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+
+def _tsquery(q: str):
+    return func.websearch_to_tsquery(_CONFIG, q)
+
+
+def _substring_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_condition(q: str):
+    """WHERE clause for tickets matching `q` (web-search syntax: words, "phrases", -excluded, or)"""
+    condition = Ticket.search_vector.op("@@")(_tsquery(q))
+    if len(q) >= MIN_SUBSTRING_LENGTH:
+        pattern = _substring_pattern(q)
+        condition = or_(
+            condition,
+            Ticket.title.ilike(pattern, escape="\\"),
+            Ticket.description.ilike(pattern, escape="\\")
+        )
+    return condition
+
+
+def search_rank(q: str):
+    """Relevance of a ticket for `q` (higher is better)"""
+    return cast(
+        func.ts_rank_cd(Ticket.search_vector, _tsquery(q), 32)
+        + SIMILARITY_WEIGHT * func.word_similarity(q, Ticket.title),
+        Float
+    )
+
+
+def search_page_query(tenant_id, q: str, limit: int = 20, cursor: Optional[str] = None, filters: Tuple = ()):
+    """
+    Ids and ranks of one page of a tenant's tickets matching `q`, best first.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    rank = search_rank(q)
+    page = (
+        select(Ticket.id, rank.label("rank"))
+        .where(Ticket.tenant_id == tenant_id, search_condition(q), *filters)
+    )
+    if cursor:
+        page = page.where(after_rank_cursor(rank, Ticket.id, cursor))
+    return page.order_by(rank.desc(), Ticket.id.desc()).limit(limit)
+
+
+async def search_tickets(
+    db: AsyncSession,
+    tenant_id,
+    q: str,
+    columns: Tuple = (Ticket.id,),
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    filters: Tuple = ()
+) -> Tuple[List, Optional[str]]:
+    """
+    One page of a tenant's tickets matching `q`, best first.
+
+    Args:
+        columns: Ticket columns to select (must include Ticket.id)
+
+    Returns:
+        (rows, next_cursor): rows have the columns plus .rank,
+        .title_highlight and .snippet (None if there is no text); next_cursor
+        is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    page = search_page_query(tenant_id, q, limit, cursor, filters).subquery()
+
+    # ts_headline re-parses the text, so it runs on the page's rows only
+    tsquery = _tsquery(q)
+    result = await db.execute(
+        select(
+            *columns,
+            page.c.rank,
+            func.ts_headline(_CONFIG, Ticket.title, tsquery, TITLE_HEADLINE_OPTIONS).label("title_highlight"),
+            func.nullif(func.ts_headline(
+                _CONFIG,
+                func.coalesce(Ticket.description, Ticket.ai_summary, ""),
+                tsquery,
+                SNIPPET_HEADLINE_OPTIONS
+            ), "").label("snippet")
+        )
+        .join(page, Ticket.id == page.c.id)
+        .order_by(page.c.rank.desc(), Ticket.id.desc())
+    )
+    rows = result.all()
+
+    page_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        page_cursor = encode_rank_cursor(last.rank, last.id)
+    return rows, page_cursor
@@ -1,46 +1,129 @@
-from sqlalchemy import text
-from app.db.session import get_db
-from app.models.ticket import AnalysisResult
+from sqlalchemy import text, select, update, bindparam
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+import uuid
+from app.consumers.stream_consumer import release_slot
+from app.core.cache import invalidate_tags
+from app.models.ticket import AnalysisResult, Ticket
+from app.services.analysis_writer import analysis_writer
+from app.services.ticket_understanding import TicketAnalysis, ticket_understanding_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Legacy analysis columns written for tickets from the ingestion service
+LEGACY_ANALYSIS_UPDATE = text("""
+    UPDATE tickets 
+    SET 
+        sentiment = :sentiment,
+        intent = :intent,
+        urgency_score = :urgency_score,
+        category = :category,
+        metadata = jsonb_set(COALESCE(metadata, '{}'), '{summary}', to_jsonb(CAST(:summary AS TEXT)), true),
+        updated_at = NOW()
+    WHERE id = :ticket_id
+""")
+
+
+def analysis_columns(analysis: TicketAnalysis) -> dict:
+    """Map a TicketAnalysis onto the ticket's ai_* columns"""
+    return {
+        "ai_summary": analysis.summary,
+        "ai_intent": analysis.intent,
+        "ai_entities": analysis.entities,
+        "ai_sentiment": analysis.sentiment,
+        "ai_priority": analysis.priority,
+        "ai_category": analysis.category,
+        "ai_suggested_actions": analysis.suggested_actions,
+        "ai_status": "completed",
+        "ai_analyzed_at": datetime.utcnow(),
+    }
+
+
+@lru_cache(maxsize=None)
+def analysis_update(columns: Tuple[str, ...]):
+    """
+    UPDATE of the given ticket columns with bound parameters.
+
+    Statements are cached per column set so the write batcher can group
+    identical statements into one executemany.
+    """
+    table = Ticket.__table__
+    return (
+        update(table)
+        .where(table.c.id == bindparam("ticket_id", type_=table.c.id.type))
+        .values({column: bindparam(f"v_{column}", type_=table.c[column].type) for column in columns})
+    )
+
+
+def analysis_update_params(ticket_id: str, values: dict) -> dict:
+    params = {f"v_{column}": value for column, value in values.items()}
+    params["ticket_id"] = uuid.UUID(str(ticket_id))
+    return params
+
+
 class TicketService:
-    async def update_ticket_analysis(self, ticket_id: str, analysis: AnalysisResult):
+    async def update_ticket_analysis(self, ticket_id: str, analysis: AnalysisResult, tenant_id: Optional[str] = None):
         """
         Updates the ticket in the database with analysis results.
-        """
-        query = text("""
-            UPDATE tickets 
-            SET 
-                sentiment = :sentiment,
-                intent = :intent,
-                urgency_score = :urgency_score,
-                category = :category,
-                metadata = jsonb_set(COALESCE(metadata, '{}'), '{summary}', to_jsonb(CAST(:summary AS TEXT)), true),
-                updated_at = NOW()
-            WHERE id = :ticket_id
-        """)
         
-        # We need to manually manage the session since we're not in a request context
-        # This is a bit of a hack for the consumer; normally we'd use dependency injection
-        from app.db.session import async_session
-        
-        async with async_session() as session:
-            try:
-                await session.execute(query, {
-                    "sentiment": analysis.sentiment,
-                    "intent": analysis.intent,
-                    "urgency_score": analysis.urgency_score,
-                    "category": analysis.category,
-                    "summary": analysis.summary,
-                    "ticket_id": ticket_id
-                })
-                await session.commit()
-                logger.info(f"Updated ticket {ticket_id} with analysis results")
-            except Exception as e:
-                logger.error(f"Failed to update ticket {ticket_id}: {e}")
-                await session.rollback()
-                raise e
+        The write is batched with other consumers' results (see
+        analysis_writer) and this returns once its batch commits.
+        """
+        try:
+            # Waiting on the batch isn't analysis work; free the consumer slot
+            release_slot()
+            await analysis_writer.submit(LEGACY_ANALYSIS_UPDATE, {
+                "sentiment": analysis.sentiment,
+                "intent": analysis.intent,
+                "urgency_score": analysis.urgency_score,
+                "category": analysis.category,
+                "summary": analysis.summary,
+                "ticket_id": ticket_id
+            })
+            logger.info(f"Updated ticket {ticket_id} with analysis results")
+            if tenant_id:
+                await invalidate_tags(tenant_id, "tickets")
+        except Exception as e:
+            logger.error(f"Failed to update ticket {ticket_id}: {e}")
+            raise e
+
+    async def analyze_and_store(self, ticket_id: str, fallback: bool = False):
+        """
+        Run AI analysis for a persisted ticket and write the results back.
+
+        Used by the analysis consumer for tickets accepted asynchronously
+        by the webhooks. LLM errors propagate, so the job stays pending and
+        is retried; the consumer marks the ticket failed once the job is
+        dead-lettered. With `fallback` (sync ingestion, which can't retry),
+        a failed call stores the placeholder analysis instead.
+        """
+        from app.core.database import AsyncSessionLocal
+
+        # Only hold a connection for the read, not across the LLM call
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Ticket.tenant_id, Ticket.title, Ticket.description).where(Ticket.id == ticket_id)
+            )
+            row = result.first()
+        if row is None:
+            logger.warning(f"Ticket {ticket_id} not found for analysis")
+            return
+
+        analysis = await ticket_understanding_service.analyze_ticket(row.title, row.description, fallback=fallback)
+        values = analysis_columns(analysis)
+
+        try:
+            release_slot()
+            await analysis_writer.submit(
+                analysis_update(tuple(values)),
+                analysis_update_params(ticket_id, values)
+            )
+            logger.info(f"Stored analysis for ticket {ticket_id} ({values['ai_status']})")
+            await invalidate_tags(row.tenant_id, "tickets")
+        except Exception as e:
+            logger.error(f"Failed to store analysis for ticket {ticket_id}: {e}")
+            raise e
 
 ticket_service = TicketService()
@@ -5,10 +5,15 @@ import json
 import logging
 from typing import Dict, List, Optional
 from pydantic import BaseModel
-from groq import Groq
+
+from app.services.llm_gateway import LLMGateway, llm_gateway
+from app.services.analysis_cache import AnalysisCache, analysis_cache
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt changes so cached analyses are not reused
+PROMPT_VERSION = "v1"
+
 
 class TicketAnalysis(BaseModel):
     """AI analysis results for a ticket"""
@@ -24,21 +29,37 @@ class TicketAnalysis(BaseModel):
 class TicketUnderstandingService:
     """Service for AI-powered ticket analysis"""
     
-    def __init__(self, groq_api_key: str):
-        self.client = Groq(api_key=groq_api_key)
+    def __init__(self, gateway: Optional[LLMGateway] = None, cache: Optional[AnalysisCache] = None):
+        self.gateway = gateway or llm_gateway
+        self.cache = cache or analysis_cache
         self.model = "llama-3.1-70b-versatile"
     
-    async def analyze_ticket(self, title: str, description: Optional[str] = None) -> TicketAnalysis:
+    async def analyze_ticket(
+        self,
+        title: str,
+        description: Optional[str] = None,
+        fallback: bool = True
+    ) -> TicketAnalysis:
         """
         Analyze a ticket using LLM to extract insights
         
         Args:
             title: Ticket title/subject
             description: Ticket description/body
+            fallback: On failure return a basic placeholder analysis. Pass
+                False where the caller can retry (the analysis consumer),
+                so a failed call isn't stored as a real analysis.
             
         Returns:
             TicketAnalysis with AI-generated insights
+        
+        Raises:
+            Exception: The gateway or parse error, if fallback is False
         """
+        cached = await self.cache.get(title, description, self.model, PROMPT_VERSION)
+        if cached:
+            return TicketAnalysis(**cached)
+        
         full_text = f"{title}\n\n{description or ''}"
         
         prompt = f"""Analyze this customer support ticket and provide structured insights.
@@ -63,15 +84,15 @@ Suggest practical actions that would help resolve the issue.
 
 Return ONLY valid JSON, no markdown formatting or explanation."""
 
+        result_text = ""
         try:
-            response = self.client.chat.completions.create(
+            result_text = await self.gateway.complete(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
                 max_tokens=1000
             )
-            
-            result_text = response.choices[0].message.content.strip()
+            result_text = result_text.strip()
             
             # Remove markdown code blocks if present
             if result_text.startswith("```"):
@@ -82,18 +103,25 @@ Return ONLY valid JSON, no markdown formatting or explanation."""
             
             # Parse JSON response
             result = json.loads(result_text)
+            analysis = TicketAnalysis(**result)
+            
+            await self.cache.set(title, description, self.model, PROMPT_VERSION, analysis.model_dump())
             
-            return TicketAnalysis(**result)
+            return analysis
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse AI response: {e}")
             logger.error(f"Response text: {result_text}")
             
+            if not fallback:
+                raise
             # Fallback to basic analysis
             return self._fallback_analysis(title, description)
             
         except Exception as e:
             logger.error(f"AI analysis failed: {e}")
+            if not fallback:
+                raise
             return self._fallback_analysis(title, description)
     
     def _fallback_analysis(self, title: str, description: Optional[str]) -> TicketAnalysis:
@@ -107,3 +135,6 @@ Return ONLY valid JSON, no markdown formatting or explanation."""
             category="other",
             suggested_actions=[]
         )
+
+
+ticket_understanding_service = TicketUnderstandingService()
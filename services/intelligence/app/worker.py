@@ -0,0 +1,169 @@
+"""
+Standalone analysis worker.
+
+Runs the stream consumers outside the API so analysis throughput scales
+independently of HTTP workers:
+
+    python -m app.worker --processes 4
+
+Pair it with API_RUN_CONSUMERS=false on the API so uvicorn workers only
+serve HTTP. SIGTERM/SIGINT stop reading new entries, let in-flight ones
+finish and get acknowledged, then flush pending writes before exiting.
+
+Each process heartbeats its consumer and DB pool stats to Redis;
+GET /health/workers on the API lists the live ones.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import signal
+import time
+
+from app.core.config import get_settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("app.worker")
+
+HEARTBEAT_KEY = "workers:heartbeats"
+HEARTBEAT_STATS_KEY = "workers:stats"
+HEARTBEAT_INTERVAL = 10
+HEARTBEAT_TTL = 30
+
+
+async def heartbeat(consumers, stop_event: asyncio.Event):
+    """Publish this process's consumer stats until told to stop"""
+    from app.core.redis import redis_client
+    from app.core.database import pool_stats
+
+    name = consumers[0].consumer_name
+    while not stop_event.is_set():
+        try:
+            client = await redis_client.get_client()
+            pipe = client.pipeline(transaction=False)
+            pipe.zadd(HEARTBEAT_KEY, {name: time.time()})
+            pipe.hset(HEARTBEAT_STATS_KEY, name, json.dumps({
+                "consumers": [consumer.stats() for consumer in consumers],
+                "database_pool": pool_stats(),
+            }))
+            # Forget workers that stopped heartbeating
+            pipe.zremrangebyscore(HEARTBEAT_KEY, 0, time.time() - HEARTBEAT_TTL)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Worker heartbeat failed: {e}")
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=HEARTBEAT_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+    try:
+        client = await redis_client.get_client()
+        pipe = client.pipeline(transaction=False)
+        pipe.zrem(HEARTBEAT_KEY, name)
+        pipe.hdel(HEARTBEAT_STATS_KEY, name)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to clear worker heartbeat: {e}")
+
+
+async def live_workers() -> list:
+    """Workers that heartbeated within HEARTBEAT_TTL seconds"""
+    from app.core.redis import redis_client
+
+    client = await redis_client.get_client()
+    names = await client.zrangebyscore(HEARTBEAT_KEY, time.time() - HEARTBEAT_TTL, "+inf", withscores=True)
+    if not names:
+        return []
+
+    stats = await client.hmget(HEARTBEAT_STATS_KEY, [name for name, _ in names])
+    return [
+        {
+            "worker": name,
+            "last_heartbeat": round(time.time() - seen, 1),
+            **(json.loads(worker_stats) if worker_stats else {"consumers": []}),
+        }
+        for (name, seen), worker_stats in zip(names, stats)
+    ]
+
+
+async def run_worker():
+    from app.consumers.redis_consumer import redis_consumer
+    from app.consumers.analysis_consumer import analysis_consumer
+    from app.services.analysis_writer import analysis_writer
+    from app.services.llm_gateway import llm_gateway
+    from app.core.redis import redis_client
+    from app.core.database import engine
+
+    consumers = [redis_consumer, analysis_consumer]
+    stop_event = asyncio.Event()
+
+    def request_stop(signame: str):
+        if stop_event.is_set():
+            return
+        logger.info(f"Received {signame}, draining...")
+        stop_event.set()
+        for consumer in consumers:
+            asyncio.ensure_future(consumer.stop())
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, request_stop, sig.name)
+
+    logger.info(f"Analysis worker {analysis_consumer.consumer_name} starting...")
+    tasks = [asyncio.create_task(consumer.start()) for consumer in consumers]
+    health_task = asyncio.create_task(heartbeat(consumers, stop_event))
+
+    # Consumers return once stopped and their in-flight entries are acknowledged
+    await asyncio.gather(*tasks)
+    stop_event.set()
+    await health_task
+
+    await analysis_writer.flush()
+    await llm_gateway.close()
+    await redis_client.close()
+    await engine.dispose()
+    logger.info("Analysis worker stopped")
+
+
+def worker_main():
+    asyncio.run(run_worker())
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the ticket analysis worker")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.WORKER_PROCESSES,
+        help="Number of worker processes (default: WORKER_PROCESSES)"
+    )
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        worker_main()
+        return
+
+    # Each child gets its own event loop, connections and consumer name
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=worker_main, name=f"worker-{i}") for i in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    def forward(signum, _frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    # Children receive Ctrl+C from the terminal themselves
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -26,11 +26,16 @@ DROP TABLE IF EXISTS strategic_recommendations CASCADE;
 DROP TABLE IF EXISTS workflows CASCADE;
 DROP TABLE IF EXISTS workflow_steps CASCADE;
 DROP TABLE IF EXISTS policies CASCADE;
+DROP TABLE IF EXISTS schema_migrations CASCADE;
 
 -- ============================================================================
 -- STEP 2: CREATE SCHEMA
 -- ============================================================================
 
+-- Ticket search indexes (idx_tickets_tenant_search and the trigram indexes)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
 CREATE TABLE tenants (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     name VARCHAR(255) NOT NULL,
@@ -61,6 +66,7 @@ CREATE TABLE api_keys (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
     name VARCHAR(255) NOT NULL,
+    prefix VARCHAR(16),
     key_hash VARCHAR(255) NOT NULL,
     permissions JSONB DEFAULT '[]',
     expires_at TIMESTAMP,
@@ -87,6 +93,7 @@ CREATE TABLE tickets (
     source VARCHAR(50) NOT NULL,
     title VARCHAR(500) NOT NULL,
     description TEXT,
+    content_hash VARCHAR(32) GENERATED ALWAYS AS (md5(title || E'\n' || COALESCE(description, ''))) STORED,
     status VARCHAR(50) DEFAULT 'open',
     priority VARCHAR(20),
     customer_email VARCHAR(255),
@@ -101,12 +108,20 @@ CREATE TABLE tickets (
     ai_priority VARCHAR(20),
     ai_suggested_actions JSONB,
     ai_category VARCHAR(100),
+    ai_status VARCHAR(20) DEFAULT 'pending',
+    ai_analyzed_at TIMESTAMP,
     tags JSONB DEFAULT '[]',
     metadata JSONB DEFAULT '{}',
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(ai_summary, '')), 'B') ||
+        setweight(to_tsvector('english', COALESCE(description, '')), 'C')
+    ) STORED,
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW(),
     resolved_at TIMESTAMP,
-    closed_at TIMESTAMP
+    closed_at TIMESTAMP,
+    sla_due_at TIMESTAMP
 );
 
 CREATE TABLE ticket_comments (
@@ -128,12 +143,38 @@ CREATE INDEX idx_tenants_slug ON tenants(slug);
 CREATE INDEX idx_users_tenant ON users(tenant_id);
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_api_keys_tenant ON api_keys(tenant_id);
+CREATE UNIQUE INDEX ix_api_keys_prefix ON api_keys(prefix);
 CREATE INDEX idx_integrations_tenant ON integrations(tenant_id);
-CREATE INDEX idx_tickets_tenant ON tickets(tenant_id);
+CREATE INDEX idx_tickets_tenant_created ON tickets(tenant_id, created_at DESC);
+CREATE INDEX idx_tickets_tenant_status_priority ON tickets(tenant_id, status, priority);
+CREATE INDEX idx_tickets_tenant_category ON tickets(tenant_id, ai_category);
+CREATE INDEX idx_tickets_open_sla ON tickets(sla_due_at) WHERE status IN ('open', 'in_progress');
+CREATE INDEX idx_tickets_tenant_search ON tickets USING GIN (tenant_id, search_vector);
+CREATE INDEX idx_tickets_tenant_title_trgm ON tickets USING GIN (tenant_id, title gin_trgm_ops);
+CREATE INDEX idx_tickets_tenant_description_trgm ON tickets USING GIN (tenant_id, description gin_trgm_ops);
 CREATE INDEX idx_tickets_status ON tickets(status);
+CREATE INDEX idx_tickets_ai_status ON tickets(ai_status) WHERE ai_status <> 'completed';
 CREATE INDEX idx_tickets_created ON tickets(created_at);
+CREATE UNIQUE INDEX uq_tickets_tenant_source_external ON tickets(tenant_id, source, external_id);
 CREATE INDEX idx_comments_ticket ON ticket_comments(ticket_id);
 
+-- This schema already includes every file in migrations/; record them so
+-- `python -m app.migrate` and the startup version check see it as current
+CREATE TABLE schema_migrations (
+    version VARCHAR(32) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+
+INSERT INTO schema_migrations (version, name) VALUES
+('003', 'unified_schema'),
+('004', 'async_ticket_analysis'),
+('005', 'ticket_external_id_upsert'),
+('006', 'ticket_content_hash'),
+('007', 'api_key_prefix'),
+('008', 'ticket_composite_indexes'),
+('009', 'ticket_search');
+
 -- ============================================================================
 -- STEP 3: INSERT REALISTIC COMPANY DATA
 -- ============================================================================
@@ -318,6 +359,9 @@ NOW() - INTERVAL '3 hours', NOW() - INTERVAL '2 hours'),
 'documentation', '["docs", "api", "v3"]',
 NOW() - INTERVAL '5 hours', NOW() - INTERVAL '5 hours');
 
+-- Seed tickets ship with their AI analysis already applied
+UPDATE tickets SET ai_status = 'completed', ai_analyzed_at = updated_at WHERE ai_summary IS NOT NULL;
+
 -- Add Comments to Various Tickets
 INSERT INTO ticket_comments (tenant_id, ticket_id, author_type, author_id, author_name, content, is_internal, created_at) VALUES
 -- TechStart comments
@@ -0,0 +1,19 @@
+-- Async ticket analysis
+-- Webhooks persist tickets immediately and hand AI analysis to the worker tier,
+-- so each ticket tracks where it is in that pipeline.
+
+-- No default yet: existing rows must not become 'pending', or the requeue
+-- sweep would enqueue every historical ticket for analysis
+ALTER TABLE tickets ADD COLUMN IF NOT EXISTS ai_status VARCHAR(20);
+ALTER TABLE tickets ADD COLUMN IF NOT EXISTS ai_analyzed_at TIMESTAMP;
+
+-- Tickets analysed inline before this migration are already complete; the
+-- rest predate the pipeline and stay NULL (never analysed, never swept)
+UPDATE tickets
+SET ai_status = 'completed', ai_analyzed_at = updated_at
+WHERE ai_summary IS NOT NULL AND ai_status IS NULL;
+
+-- New tickets start pending
+ALTER TABLE tickets ALTER COLUMN ai_status SET DEFAULT 'pending';
+
+CREATE INDEX IF NOT EXISTS idx_tickets_ai_status ON tickets(ai_status) WHERE ai_status <> 'completed';
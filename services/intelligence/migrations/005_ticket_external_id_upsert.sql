@@ -0,0 +1,35 @@
+-- Ticket upserts by external id
+-- Webhooks write with INSERT ... ON CONFLICT (tenant_id, source, external_id),
+-- which needs a unique index on that key. Collapse duplicates created by
+-- earlier SELECT-then-INSERT races first, keeping the most recently updated row.
+
+BEGIN;
+
+CREATE TEMP TABLE ticket_duplicates ON COMMIT DROP AS
+SELECT id, keep_id
+FROM (
+    SELECT
+        id,
+        first_value(id) OVER (
+            PARTITION BY tenant_id, source, external_id
+            ORDER BY updated_at DESC NULLS LAST, created_at DESC
+        ) AS keep_id
+    FROM tickets
+    WHERE external_id IS NOT NULL
+) ranked
+WHERE id <> keep_id;
+
+UPDATE ticket_comments c
+SET ticket_id = d.keep_id
+FROM ticket_duplicates d
+WHERE c.ticket_id = d.id;
+
+DELETE FROM tickets t
+USING ticket_duplicates d
+WHERE t.id = d.id;
+
+COMMIT;
+
+-- CONCURRENTLY can't run inside a transaction block
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_tickets_tenant_source_external
+ON tickets(tenant_id, source, external_id);
@@ -0,0 +1,8 @@
+-- Ticket content hash
+-- Webhook updates re-run AI analysis only when the title or description
+-- changes. Postgres keeps the fingerprint in sync for every writer, so the
+-- bulk COPY path and direct SQL never leave it stale.
+-- Adding a stored generated column rewrites the table; run off-peak.
+
+ALTER TABLE tickets ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32)
+    GENERATED ALWAYS AS (md5(title || E'\n' || COALESCE(description, ''))) STORED;
@@ -0,0 +1,10 @@
+-- API key prefixes
+-- Keys look like avk_<prefix>_<secret>. The prefix is public and indexed,
+-- so authentication is one lookup followed by an HMAC-SHA256 comparison.
+-- Rows created before this have no prefix and can't authenticate; reissue them.
+
+ALTER TABLE api_keys ADD COLUMN IF NOT EXISTS prefix VARCHAR(16);
+
+-- CONCURRENTLY can't run inside a transaction block
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_api_keys_prefix
+ON api_keys(prefix);
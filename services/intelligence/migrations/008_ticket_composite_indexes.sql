@@ -0,0 +1,23 @@
+-- Composite and partial ticket indexes
+-- Ticket routes filter by tenant and sort by created_at, or filter by tenant
+-- and status/priority/category; SLA checks scan open tickets by due date.
+-- The single-column tenant_id indexes are a prefix of idx_tickets_tenant_created
+-- and only add write cost, so they are dropped.
+-- Each index builds CONCURRENTLY (no write lock); this file must not run in a
+-- transaction block. Check the result with scripts/check_ticket_indexes.py.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tickets_tenant_created
+ON tickets(tenant_id, created_at DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tickets_tenant_status_priority
+ON tickets(tenant_id, status, priority);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tickets_tenant_category
+ON tickets(tenant_id, ai_category);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tickets_open_sla
+ON tickets(sla_due_at)
+WHERE status IN ('open', 'in_progress');
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_tickets_tenant;
+DROP INDEX CONCURRENTLY IF EXISTS ix_tickets_tenant_id;
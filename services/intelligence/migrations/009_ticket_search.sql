@@ -0,0 +1,29 @@
+-- Full-text ticket search
+-- search_vector is a generated tsvector over title (weight A), ai_summary (B)
+-- and description (C), kept current by Postgres on every write. GIN indexes
+-- lead with tenant_id (btree_gin), so a search only walks the tenant's own
+-- postings. pg_trgm indexes on title and description serve substring
+-- matches that whole-word search misses (partial words, order numbers).
+-- Adding a STORED generated column rewrites the table under an exclusive
+-- lock; on a large tickets table run this file in a maintenance window.
+-- The indexes build CONCURRENTLY, so this file must not run in a transaction
+-- block.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE(ai_summary, '')), 'B') ||
+    setweight(to_tsvector('english', COALESCE(description, '')), 'C')
+) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tickets_tenant_search
+ON tickets USING GIN (tenant_id, search_vector);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tickets_tenant_title_trgm
+ON tickets USING GIN (tenant_id, title gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tickets_tenant_description_trgm
+ON tickets USING GIN (tenant_id, description gin_trgm_ops);
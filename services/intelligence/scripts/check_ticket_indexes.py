@@ -0,0 +1,149 @@
+"""
+EXPLAIN check: do the hot ticket queries use the ticket indexes?
+
+Takes its statements from the same builders the routes in
+app/api/routes/tickets.py, app/services/ticket_search.py and the helpers in
+app/api/db.py use, runs EXPLAIN on each and checks the plan uses one
+of the indexes from migrations/008_ticket_composite_indexes.sql and
+migrations/009_ticket_search.sql (or the existing index listed for it).
+
+Small development databases make the planner prefer sequential scans, so by
+default the check runs with enable_seqscan off; that answers "can this
+query use the index", not "would it on this data". Pass --natural to see
+the planner's own choice.
+
+Usage (from services/intelligence):
+    DATABASE_URL=... python scripts/check_ticket_indexes.py [--tenant-id UUID] [--natural]
+
+Exits 1 if any query misses its index.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+
+def ticket_queries(tenant_id):
+    """(name, statement, acceptable indexes) for each hot query"""
+    from app.api.db import dashboard_kpi_queries, tickets_with_analysis_query
+    from app.api.pagination import encode_cursor
+    from app.api.routes.tickets import ticket_filters, ticket_list_query, ticket_stats_query
+    from app.models.ticket import Ticket
+    from app.services.ticket_search import search_page_query
+    
+    now = datetime.utcnow()
+    deep_cursor = encode_cursor(now - timedelta(days=365), uuid.uuid4())
+    kpis = dashboard_kpi_queries(tenant_id, now)
+    
+    return [
+        # tickets.py: GET /api/tickets
+        ("tickets: list", ticket_list_query(tenant_id),
+         {"idx_tickets_tenant_created"}),
+        ("tickets: list ?cursor", ticket_list_query(tenant_id, cursor=deep_cursor),
+         {"idx_tickets_tenant_created"}),
+        ("tickets: list ?status", ticket_list_query(tenant_id, ticket_filters(status="open")),
+         {"idx_tickets_tenant_created", "idx_tickets_tenant_status_priority"}),
+        ("tickets: list ?status&priority", ticket_list_query(tenant_id, ticket_filters(status="open", priority="high")),
+         {"idx_tickets_tenant_created", "idx_tickets_tenant_status_priority"}),
+        ("tickets: list ?category", ticket_list_query(tenant_id, ticket_filters(category="billing")),
+         {"idx_tickets_tenant_created", "idx_tickets_tenant_category"}),
+        ("tickets: list ?search", ticket_list_query(tenant_id, ticket_filters(search="refund")),
+         {"idx_tickets_tenant_created", "idx_tickets_tenant_search"}),
+        
+        # tickets.py: GET /api/tickets/search (full text, and full text + substring)
+        ("tickets: search ?q=ab", search_page_query(tenant_id, "ab"),
+         {"idx_tickets_tenant_search"}),
+        ("tickets: search ?q=refund", search_page_query(tenant_id, "refund"),
+         {"idx_tickets_tenant_search", "idx_tickets_tenant_title_trgm", "idx_tickets_tenant_description_trgm"}),
+        
+        # tickets.py: GET /api/tickets/stats/summary
+        ("tickets: stats by status", ticket_stats_query(tenant_id, Ticket.status),
+         {"idx_tickets_tenant_status_priority"}),
+        ("tickets: stats by priority", ticket_stats_query(tenant_id, Ticket.priority),
+         {"idx_tickets_tenant_status_priority"}),
+        ("tickets: stats by category", ticket_stats_query(tenant_id, Ticket.ai_category),
+         {"idx_tickets_tenant_category"}),
+        
+        # api/db.py: get_dashboard_kpis
+        ("db: open tickets", kpis["open_tickets"],
+         {"idx_tickets_tenant_status_priority", "idx_tickets_open_sla"}),
+        ("db: SLA risk", kpis["sla_risk_count"],
+         {"idx_tickets_open_sla", "idx_tickets_tenant_status_priority"}),
+        ("db: avg resolution in 7 days", kpis["avg_resolution_hours"],
+         {"idx_tickets_tenant_created"}),
+        ("db: tickets created in 7 days", kpis["total_tickets_7d"],
+         {"idx_tickets_tenant_created"}),
+        ("db: resolved in 7 days", kpis["resolved_tickets_7d"],
+         {"idx_tickets_tenant_created"}),
+        
+        # api/db.py: get_tickets_with_analysis
+        ("db: tickets with analysis", tickets_with_analysis_query(),
+         {"idx_tickets_created"}),
+    ]
+
+
+def plan_indexes(node) -> set:
+    """Index names used anywhere in an EXPLAIN (FORMAT JSON) plan"""
+    found = set()
+    if "Index Name" in node:
+        found.add(node["Index Name"])
+    for child in node.get("Plans", []):
+        found |= plan_indexes(child)
+    return found
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--tenant-id", help="Tenant to scope queries to (default: any tenant)")
+    parser.add_argument("--natural", action="store_true", help="Leave sequential scans enabled")
+    args = parser.parse_args()
+    
+    if not os.getenv("DATABASE_URL"):
+        print("❌ ERROR: DATABASE_URL environment variable not set")
+        return 2
+    
+    from app.core.database import create_engine
+    
+    engine = create_engine(pool_size=1, max_overflow=0)
+    dialect = postgresql.dialect()
+    failures = 0
+    try:
+        async with engine.connect() as conn:
+            tenant_id = args.tenant_id or (await conn.execute(text("SELECT id FROM tenants LIMIT 1"))).scalar()
+            if tenant_id is None:
+                print("❌ No tenants found; pass --tenant-id")
+                return 2
+            
+            if not args.natural:
+                await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            
+            print(f"Tenant: {tenant_id}  (enable_seqscan {'on' if args.natural else 'off'})\n")
+            for name, statement, expected in ticket_queries(tenant_id):
+                sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+                result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                used = plan_indexes(plan[0]["Plan"])
+                ok = bool(used & expected)
+                failures += not ok
+                print(f"{'✅' if ok else '❌'} {name:<32} uses: {', '.join(sorted(used)) or 'no index'}")
+                if not ok:
+                    print(f"   expected one of: {', '.join(sorted(expected))}")
+    finally:
+        await engine.dispose()
+    
+    print(f"\n{'All queries use their indexes' if not failures else f'{failures} queries miss their indexes'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))